@@ -5,6 +5,8 @@ hold_vsys_en_pin = Pin(HOLD_VSYS_EN_PIN, Pin.OUT, value=True)
 
 from pimoroni_i2c import PimoroniI2C # type: ignore
 from led_manager import LedManager
+import flash_stats
+import boot_profile
 import time
 import config
 from phew import logging
@@ -13,6 +15,7 @@ logging.disable_logging_types(logging.LOG_DEBUG | logging.LOG_INFO | logging.LOG
 
 i2c = PimoroniI2C(I2C_SDA_PIN, I2C_SCL_PIN, 100000)
 i2c_devices = i2c.scan()
+boot_profile.mark("i2c scan")
 
 model = "weather"
 
@@ -52,24 +55,58 @@ if needs_provisioning:
     sys.exit()
     # import enviro.provisioning
 
+boot_profile.mark("button and provisioning check")
+
 
 # Start reading here
 # ===========================================================================
 import sys, os, ujson
+import uasyncio as asyncio
 from machine import RTC, ADC
 import phew
 from pcf85063a import PCF85063A # type: ignore
 import enviro.config_defaults as config_defaults
+import enviro.config_store as config_store
 import enviro.helpers as helpers
-from wifi_manager import WifiManager
+import enviro.energy as energy
+import enviro.derived as derived
+import enviro.state as state
+from enviro.reading import Reading, Schema, write_json
 
 # read the state of vbus to know if we were woken up by USB
 vbus_present = Pin("WL_GPIO2", Pin.IN).value()
 
-# create wifi object
-wifi_manager = WifiManager(vbus_present)
+# wifi is only brought up by the wake paths that go online
+_wifi_manager = None
+
+
+def get_wifi_manager():
+    global _wifi_manager
+    if _wifi_manager is None:
+        from wifi_manager import WifiManager
+
+        _wifi_manager = WifiManager(vbus_present)
+    return _wifi_manager
+
+
+class _LazyWifiManager:
+    # the copies of lib/ota_light.py already on stations (it is not updated
+    # over the air) still call enviro.wifi_manager.connect()
+    def __getattr__(self, name):
+        return getattr(get_wifi_manager(), name)
+
 
-config_defaults.add_missing_config_settings()
+wifi_manager = _LazyWifiManager()
+
+
+# settings changed at runtime sit on top of config.py
+config_store.load()
+try:
+    config_defaults.add_missing_config_settings()
+except ValueError as e:
+    logging.error(f"! {e}")
+    raise
+boot_profile.mark("config")
 
 # set up the button, external trigger, and rtc alarm pins
 rtc_alarm_pin = Pin(RTC_ALARM_PIN, Pin.IN, Pin.PULL_DOWN)
@@ -82,6 +119,7 @@ rtc.enable_timer_interrupt(False)
 t = rtc.datetime()
 # BUG ERRNO 22, EINVAL, when date read from RTC is invalid for the pico's RTC.
 RTC().datetime((t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0))  # synch PR2040 rtc too
+boot_profile.mark("rtc")
 
 
 # log the error, blink the warning led, and go back to sleep
@@ -115,22 +153,9 @@ def is_clock_set():
     if rtc.datetime()[0] <= 2020:
         return False
 
-    if helpers.file_exists("sync_time.txt"):
-        now_str = helpers.datetime_string()
-        now = helpers.timestamp(now_str)
-
-        time_entries = []
-        with open("sync_time.txt", "r") as timefile:
-            time_entries = timefile.read().split("\n")
-
-        # read the first line from the time file
-        sync = now
-        for entry in time_entries:
-            if entry:
-                sync = helpers.timestamp(entry)
-                break
-
-        seconds_since_sync = now - sync
+    last_sync = state.store.get("last_ntp_sync")
+    if last_sync is not None:
+        seconds_since_sync = helpers.timestamp(helpers.datetime_string()) - last_sync
         if seconds_since_sync >= 0:  # there's the rare chance of having a newer sync time than what the RTC reports
             try:
                 if seconds_since_sync < (config.resync_frequency * 60 * 60):
@@ -147,7 +172,10 @@ def is_clock_set():
 def sync_clock_from_ntp():
     from phew import ntp
 
-    if not wifi_manager.connect():
+    energy.set_phase("wifi")
+    connected = get_wifi_manager().connect()
+    energy.set_phase(energy.IDLE)
+    if not connected:
         return False
     # TODO Fetch only does one attempt. Can also optionally set Pico RTC (do we want this?)
     timestamp = ntp.fetch()
@@ -165,15 +193,12 @@ def sync_clock_from_ntp():
     dt = rtc.datetime()
     if dt != timestamp[0:7]:
         logging.error("  - failed to update rtc")
-        if helpers.file_exists("sync_time.txt"):
-            os.remove("sync_time.txt")
+        state.store.set("last_ntp_sync", None)
         return False
 
     logging.info("  - rtc synched")
 
-    # write out the sync time log
-    with open("sync_time.txt", "w") as syncfile:
-        syncfile.write("{0:04d}-{1:02d}-{2:02d}T{3:02d}:{4:02d}:{5:02d}Z".format(*timestamp))
+    state.store.set("last_ntp_sync", helpers.timestamp("{0:04d}-{1:02d}-{2:02d}T{3:02d}:{4:02d}:{5:02d}Z".format(*timestamp)))
 
     return True
 
@@ -212,84 +237,282 @@ def wake_reason_name(wake_reason):
     return names.get(wake_reason)
 
 
+# qw/st modules: (name, i2c address, module in enviro.qwst_modules)
+QWST_MODULES = (
+    ("LTR390", I2C_ADDR_LTR390, "ltr390"),
+    ("INA219", I2C_ADDR_INA219, "ina219"),
+    ("SCD41", I2C_ADDR_SCD41, "scd41"),
+)
+
+# registry of the modules found on the qw/st port, built once and kept
+# for the lifetime of the firmware along with their initialised drivers
+_qwst_modules = None
+
+
 # get modules conected to qw/st port
 def get_qwst_modules():
-    modules = []
-    if I2C_ADDR_LTR390 in i2c_devices:  # LTR390
+    global _qwst_modules
+    if _qwst_modules is not None:
+        return _qwst_modules
+
+    _qwst_modules = []
+    for name, address, module_name in QWST_MODULES:
+        if address not in i2c_devices:
+            continue
         try:
-            import enviro.qwst_modules.ltr390 as ltr390
+            include = helpers.import_module_compat(f"enviro.qwst_modules.{module_name}")
+        except ImportError as e:
+            logging.error(f"! cannot load module {name}: {e}")
+            continue
+        _qwst_modules.append({"name": name, "include": include, "address": address, "driver": None, "probe": False})
+
+    return _qwst_modules
 
-            modules.append({"name": "LTR390", "include": ltr390, "address": I2C_ADDR_LTR390})
-        except RuntimeError:
-            pass
-    if I2C_ADDR_INA219 in i2c_devices:  # LTR390
-        try:
-            import enviro.qwst_modules.ina219 as ina219
 
-            modules.append({"name": "INA219", "include": ina219, "address": I2C_ADDR_INA219})
-        except RuntimeError:
-            pass
-    if I2C_ADDR_SCD41 in i2c_devices:  # SCD41
+def init_qwst_modules():
+    """Initialise the module drivers up front so they (and the INA219 energy meter) run from boot."""
+    for module in get_qwst_modules():
         try:
-            import enviro.qwst_modules.scd41 as scd41
+            _qwst_driver(module)
+        except Exception as e:
+            logging.error(f"! failed to initialise {module['name']}: {e}")
+            module["probe"] = True
+
+
+def _qwst_driver(module):
+    """Initialised driver for a module, created on first use or after an I2C error."""
+    if module["driver"] is None:
+        if module["probe"]:
+            if module["address"] not in i2c.scan():
+                return None
+            module["probe"] = False
+        module["driver"] = module["include"].init(i2c, module["address"])
+        logging.debug(f"  - {module['name']} initialised")
+    return module["driver"]
+
+
+# concurrent sensor acquisition
+# ===========================================================================
+# every source exposes start(...) -> state and poll(state, ...) -> None until it
+# is done, so conversions run side by side and the cycle takes as long as the
+# slowest one. qw/st modules write their values straight into the reading record
+ACQUIRE_POLL_MS = 10
+ACQUIRE_TIMEOUT_MS = 1000
+
+
+async def _acquire(name, start, poll, args, poll_args, timeout_ms, results):
+    state = start(*args)
+    started = time.ticks_ms()
+    while True:
+        result = poll(state, *poll_args)
+        if result is not None:
+            results[name] = result
+            return
+        if time.ticks_diff(time.ticks_ms(), started) > timeout_ms:
+            logging.warn(f"  - {name} not ready after {timeout_ms}ms, skipping")
+            return
+        await asyncio.sleep_ms(ACQUIRE_POLL_MS)
+
+
+async def _acquire_board(board, results):
+    try:
+        await _acquire("board", board.start_readings, board.poll_readings, (), (), ACQUIRE_TIMEOUT_MS, results)
+    except Exception as e:
+        logging.error(f"! failed to read board sensors: {e}")
+
+
+async def _acquire_module(module, reading, results):
+    name = module["name"]
+    include = module["include"]
+    logging.debug(f"> getting readings from module: {name}")
+    try:
+        driver = _qwst_driver(module)
+        if driver is None:
+            logging.warn(f"  - {name} not found on the i2c bus")
+            return
+        timeout_ms = getattr(include, "ACQUIRE_TIMEOUT_MS", ACQUIRE_TIMEOUT_MS)
+        await _acquire(name, include.start, include.poll, (driver,), (reading,), timeout_ms, results)
+    except OSError as e:
+        # bus error: drop the driver and probe the address again next cycle
+        logging.error(f"! i2c error reading {name}: {e}")
+        module["driver"] = None
+        module["probe"] = True
+    except Exception as e:
+        logging.error(f"! failed to read {name}: {e}")
+
+
+async def _acquire_all(board, modules, reading, results):
+    tasks = [asyncio.create_task(_acquire_board(board, results))]
+    for module in modules:
+        tasks.append(asyncio.create_task(_acquire_module(module, reading, results)))
+    await asyncio.gather(*tasks)
+
+
+def acquire_readings(board, modules, reading):
+    """Run the board and qw/st module acquisitions concurrently, results keyed by source name."""
+    results = {}
+    asyncio.run(_acquire_all(board, modules, reading, results))
+    return results
+
+
+# the reading record reused every cycle, laid out on first use
+_reading = None
+
+
+def get_reading_record():
+    global _reading
+    if _reading is None:
+        fields = get_board().READING_FIELDS
+        for module in get_qwst_modules():
+            fields = fields + module["include"].FIELDS
+        _reading = Reading(Schema(fields))
+    return _reading
+
+
+# rolling 7-day history of hourly aggregates, opened on first use
+_history = None
+
+
+def _history_names():
+    # everything a reading can hold plus the published derived metrics
+    return get_reading_record().schema.names + tuple(config.derived_metrics)
+
 
-            modules.append({"name": "SCD41", "include": scd41, "address": I2C_ADDR_SCD41})
-        except RuntimeError:
-            pass
+def get_history():
+    global _history
+    if _history is None:
+        from enviro.history import HourlyHistory
 
-    return modules
+        _history = HourlyHistory(_history_names())
+    return _history
+
+
+def _relayout_history(changes):
+    if _history is not None:
+        _history.set_fields(_history_names())
+
+
+config_store.subscribe(("derived_metrics",), _relayout_history)
+
+
+# daily flash wear report, rewritten when the date changes
+FLASH_REPORT_FILE = "flash_report.txt"
 
 
 # get the readings from the on board sensors
 def get_sensor_readings():
+    energy.set_phase("sampling")
     seconds_since_last = 0
     now_str = helpers.datetime_string()
-    if helpers.file_exists("last_time.txt"):
-        now = helpers.timestamp(now_str)
+    now = helpers.timestamp(now_str)
+    last = state.store.get("last_reading")
+    if last is not None:
+        seconds_since_last = now - last
+        logging.debug(f"  - seconds since last reading: {seconds_since_last}")
 
-        time_entries = []
-        with open("last_time.txt", "r") as timefile:
-            time_entries = timefile.read().split("\n")
+    board = get_board()
+    reading = get_reading_record()
+    reading.clear()
+    results = acquire_readings(board, get_qwst_modules(), reading)
+    board.get_sensor_readings(seconds_since_last, vbus_present, reading, results.get("board"))
 
-        # read the first line from the time file
-        last = now
-        for entry in time_entries:
-            if entry:
-                last = helpers.timestamp(entry)
-                break
+    # derived metrics are only computed when a sink asks for them
+    readings = derived.Readings(reading)
 
-        seconds_since_last = now - last
-        logging.debug(f"  - seconds since last reading: {seconds_since_last}")
+    try:
+        get_history().record(readings, now)
+    except Exception as e:
+        logging.error(f"! failed to update hourly history: {e}")
 
-    readings = get_board().get_sensor_readings(seconds_since_last, vbus_present)
-    # append qw/st module readings to payload
-    for module in get_qwst_modules():
-        logging.debug(f"> getting readings from module: {module['name']}")
-        readings = readings | module["include"].get_readings(i2c, module["address"])
+    try:
+        archive = get_reading_archive()
+        if archive is not None:
+            archive.append(now, reading)
+            archive.delete_before(now - config.reading_archive_days * 86400)
+    except Exception as e:
+        logging.error(f"! failed to archive reading: {e}")
+
+    state.store.set("last_reading", now)
 
-    # write out the last time log
-    with open("last_time.txt", "w") as timefile:
-        timefile.write(now_str)
+    # once a day, keep what the flash went through and where (see flash_stats)
+    report = flash_stats.roll_day(now_str[:10])
+    if report is not None:
+        logging.debug(f"> {report}")
+        with flash_stats.open(FLASH_REPORT_FILE, "w") as report_file:
+            report_file.write(report)
 
+    energy.set_phase(energy.IDLE)
     return readings
 
 
-# save the provided readings into a todays readings data file
+# btree archive of every reading keyed by time, opened on first use when enabled
+_reading_archive = None
+
+
+def get_reading_archive():
+    global _reading_archive
+    if _reading_archive is None and config.reading_archive:
+        from enviro.archive import ReadingArchive
+
+        try:
+            _reading_archive = ReadingArchive()
+        except ImportError as e:
+            logging.warn(f"> reading archive disabled: {e}")
+            config.reading_archive = False
+    return _reading_archive
+
+
+# local csv archive of readings, opened on first use
+_archive = None
+
+
+def get_archive():
+    global _archive
+    if _archive is None:
+        from enviro.csv_archive import CsvArchive
+
+        _archive = CsvArchive(
+            period=config.archive_period,
+            flush_every=config.archive_flush_every,
+            max_bytes=config.archive_max_bytes,
+        )
+    return _archive
+
+
+def _reopen_archives(changes):
+    global _archive, _reading_archive
+    if _archive is not None:
+        _archive.flush()
+        _archive = None
+    if _reading_archive is not None and not config.reading_archive:
+        _reading_archive.close()
+        _reading_archive = None
+
+
+config_store.subscribe(
+    ("archive_period", "archive_flush_every", "archive_max_bytes", "reading_archive"), _reopen_archives
+)
+
+
+# save the provided readings into the readings archive (buffered, see csv_archive)
 def save_reading(readings):
-    # open todays reading file and save readings
-    helpers.mkdir_safe("readings")
-    readings_filename = f"readings/{helpers.datetime_file_string()}.txt"
-    new_file = not helpers.file_exists(readings_filename)
-    with open(readings_filename, "a") as f:
-        if new_file:
-            # new readings file so write out column headings first
-            f.write("timestamp," + ",".join(readings.keys()) + "\r\n")
-
-        # write sensor data
-        row = [helpers.datetime_string()]
-        for key in readings.keys():
-            row.append(str(readings[key]))
-        f.write(",".join(row) + "\r\n")
+    get_archive().append(helpers.datetime_string(), readings)
+
+
+# write the buffered archive rows before a reset would lose them
+def flush_archive():
+    if _archive is not None:
+        try:
+            _archive.flush()
+        except Exception as e:
+            logging.error(f"! failed to flush readings archive: {e}")
+
+
+# the timeline of a profiled boot rides along with the first payload after it
+def boot_profile_summary():
+    if config.boot_profile_publish:
+        return boot_profile.take_summary()
+    return None
 
 
 # normalize payload to sends to destination
@@ -299,23 +522,46 @@ def normalize_payload(readings):
         "nickname": config.nickname, 
         "timestamp": helpers.datetime_string(), 
         "firmware": ENVIRO_VERSION,
-        "readings": readings, 
+        "readings": readings.to_dict(), 
         "model": model, 
         "uid": helpers.uid(),
     }
     # fmt: on
+    summary = boot_profile_summary()
+    if summary:
+        payload["boot_profile"] = summary
 
     return payload
 
 
+# stream the same payload as normalize_payload() as json, readings straight from the record
+def write_payload(f, readings):
+    f.write('{"readings":')
+    write_json(f, readings.items())
+    for key, value in (
+        ("nickname", config.nickname),
+        ("timestamp", helpers.datetime_string()),
+        ("firmware", ENVIRO_VERSION),
+        ("model", model),
+        ("uid", helpers.uid()),
+    ):
+        f.write(',"')
+        f.write(key)
+        f.write('":')
+        f.write(ujson.dumps(value))
+    summary = boot_profile_summary()
+    if summary:
+        f.write(',"boot_profile":')
+        f.write(ujson.dumps(summary))
+    f.write("}")
+
+
 # save the provided readings into a cache file for future uploading
 def cache_upload(readings):
-    payload = normalize_payload(readings)
     uploads_filename = f"uploads/{helpers.datetime_file_string()}.json"
     helpers.mkdir_safe("uploads")
-    with open(uploads_filename, "w") as upload_file:
-        # json.dump(payload, upload_file) # TODO what it was changed to
-        upload_file.write(ujson.dumps(payload))
+    with flash_stats.open(uploads_filename, "w") as upload_file:
+        write_payload(upload_file, readings)
 
 
 # return the number of cached results waiting to be uploaded
@@ -340,9 +586,12 @@ def is_upload_needed():
 
 # upload the readings to a destination
 def upload_readings(readings=None):
-    if not wifi_manager.connect():
+    energy.set_phase("wifi")
+    if not get_wifi_manager().connect():
         logging.error(f"! cannot upload readings, wifi connection failed")
+        energy.set_phase(energy.IDLE)
         return False
+    energy.set_phase("upload")
 
     destination = config.destination
     secondary_destination = config.secondary_destination
@@ -358,7 +607,7 @@ def upload_readings(readings=None):
             destination_module = helpers.import_module_compat(f"enviro.destinations.{destination}")
         except Exception as e:
             logging.error(f"! cannot import destination {destination}: {e}")
-            wifi_manager.disconnect()
+            get_wifi_manager().disconnect()
             return False
 
         secondary_destination_module = None
@@ -377,14 +626,14 @@ def upload_readings(readings=None):
 
         if readings is not None:
             payload = normalize_payload(readings)
-            payload["wifi"] = wifi_manager.get_last_signal_strength()
+            payload["wifi"] = get_wifi_manager().get_last_signal_strength()
             payload["file"] = None
             jsons.append(payload)
         else:
             for cache_file in os.ilistdir("uploads"):
                 with open(f"uploads/{cache_file[0]}", "r") as upload_file:
                     payload = ujson.load(upload_file)
-                    payload["wifi"] = wifi_manager.get_last_signal_strength()
+                    payload["wifi"] = get_wifi_manager().get_last_signal_strength()
                     payload["file"] = cache_file[0]
                     jsons.append(payload)
 
@@ -394,30 +643,27 @@ def upload_readings(readings=None):
                 del json["file"]
                 if not hasattr(destination_module, "upload_reading"):
                     logging.error(f"! destination {destination} missing upload_reading()")
-                    wifi_manager.disconnect()
+                    get_wifi_manager().disconnect()
                     return False
                 status = destination_module.upload_reading(json)
                 if status == UPLOAD_SUCCESS:
                     if file_name is not None:
-                        os.remove(f"uploads/{file_name}")
+                        flash_stats.remove(f"uploads/{file_name}")
                         logging.debug(f"  - uploaded {file_name}")
                     else:
                         logging.debug(f"  - uploaded readings on demand")
                 elif status == UPLOAD_RATE_LIMITED and file_name is not None:
-                    # write out that we want to attempt a reupload
-                    with open("reattempt_upload.txt", "w") as attemptfile:
-                        attemptfile.write("")
+                    # remember that we want to attempt a reupload
+                    state.store.set("reattempt_upload", True)
 
                     logging.warn(f"  - cannot upload '{file_name}' - rate limited")
                     sleep(1)
                 elif status == UPLOAD_LOST_SYNC and file_name is not None:
-                    # remove the sync time file to trigger a resync on next boot
-                    if helpers.file_exists("sync_time.txt"):
-                        os.remove("sync_time.txt")
+                    # forget the last sync to trigger a resync on next boot
+                    state.store.set("last_ntp_sync", None)
 
-                    # write out that we want to attempt a reupload
-                    with open("reattempt_upload.txt", "w") as attemptfile:
-                        attemptfile.write("")
+                    # remember that we want to attempt a reupload
+                    state.store.set("reattempt_upload", True)
 
                     logging.warn(f"  - cannot upload '{file_name}' - rtc has become out of sync")
                     sleep(1)
@@ -459,14 +705,18 @@ def upload_readings(readings=None):
         return False
 
     finally:
-        wifi_manager.disconnect()
+        get_wifi_manager().disconnect()
+        energy.set_phase(energy.IDLE)
 
     return True
 
 
 # HASS Discovery
 def hass_discovery():
-    if not wifi_manager.connect():
+    energy.set_phase("wifi")
+    connected = get_wifi_manager().connect()
+    energy.set_phase(energy.IDLE)
+    if not connected:
         logging.error(f"! wifi connection failed")
         return False
 
@@ -475,7 +725,7 @@ def hass_discovery():
         exec(f"import enviro.destinations.{destination}")
         destination_module = sys.modules[f"enviro.destinations.{destination}"]
         destination_module.hass_discovery()
-        helpers.update_config("hass_discovery_triggered", True)
+        config_store.set("hass_discovery_triggered", True)
     except ImportError:
         logging.error(f"! cannot find destination {destination}")
         return False
@@ -492,6 +742,7 @@ def startup():
     logging.debug(f"  - running Enviro {ENVIRO_VERSION}, {sys.version.split('; ')[1]}")
 
     helpers.check_i2c_and_flag_discovery(i2c_devices)
+    init_qwst_modules()
 
     # get the reason we were woken up
     reason = get_wake_reason()
@@ -514,17 +765,17 @@ def startup():
     logging.debug("  - turn on activity led")
 
     # see if we were woken to attempt a reupload
-    if helpers.file_exists("reattempt_upload.txt"):
+    if state.store.get("reattempt_upload"):
         upload_count = cached_upload_count()
         if upload_count == 0:
-            os.remove("reattempt_upload.txt")
+            state.store.set("reattempt_upload", None)
             return
 
         logging.debug(f"> {upload_count} cache file(s) still to upload")
         if not upload_readings():
             halt("! reading upload failed")
 
-        os.remove("reattempt_upload.txt")
+        state.store.set("reattempt_upload", None)
 
         # if it was the RTC that woke us, go to sleep until our next scheduled reading
         # otherwise continue with taking new readings etc
@@ -532,6 +783,10 @@ def startup():
         if reason == WAKE_REASON_RTC_ALARM:
             sleep()
 
+# board functions polled every 250 ms while sleeping
+SLEEP_HOOKS = ("check_trigger", "sample_wind", "sample_sensors")
+
+
 # finishs the program
 def sleep(time_override=None):
     """
@@ -540,6 +795,8 @@ def sleep(time_override=None):
     - Uses config.reading_frequency (min) when time_override is None
     - While "sleeping", calls board.check_trigger() para continuar
       registrando chuva e permite sair pelo botão.
+    - Also calls board.sample_wind() so wind statistics keep a fixed cadence
+      and board.sample_sensors() to oversample the fast sensors.
     """
 
     import enviro  # garante acesso a get_board
@@ -558,24 +815,43 @@ def sleep(time_override=None):
     # vamos só "apagar" a atividade e ficar em laço leve
     leds_manager.stop_activity()
 
+    # a boot that goes straight to sleep ends its profile here
+    boot_profile.finish()
+
+    # the reading has been uploaded, the full sleep closes the energy cycle
+    if time_override is None:
+        energy.close_cycle()
+
+    # the cycle's state changes go to flash in one write
+    try:
+        state.store.flush()
+    except Exception as e:
+        logging.error(f"! failed to save state: {e}")
+
     logging.debug(f"  - light sleep for {total_seconds} second(s)")
 
-    step = 0.25  # resolução de 250 ms para checar sensor de chuva / botão
-    steps = int(total_seconds / step)
+    step_ms = 250  # resolução de 250 ms para checar sensor de chuva / botão
+    steps = int(total_seconds * 1000 / step_ms)
 
+    # deadline-based so the board's fixed-cadence sampling doesn't drift
+    deadline = time.ticks_ms()
     for _ in range(steps):
-        # deixa a board.weather registrar chuva enquanto estamos "dormindo"
-        if hasattr(board, "check_trigger"):
-            try:
-                board.check_trigger()
-            except Exception as exc:
-                logging.error(f"! error in board.check_trigger: {exc}")
+        # deixa a board.weather registrar chuva, vento e sensores enquanto estamos "dormindo"
+        for hook in SLEEP_HOOKS:
+            if hasattr(board, hook):
+                try:
+                    getattr(board, hook)()
+                except Exception as exc:
+                    logging.error(f"! error in board.{hook}: {exc}")
 
         # botão pode interromper o sleep (por ex. pra reconfigurar)
         if button_pin.value():
             logging.debug("  - sleep interrupted by button press")
             break
 
-        time.sleep(step)
+        deadline = time.ticks_add(deadline, step_ms)
+        remaining = time.ticks_diff(deadline, time.ticks_ms())
+        if remaining > 0:
+            time.sleep_ms(remaining)
 
     logging.debug("  - sleep finished")
@@ -0,0 +1,265 @@
+import struct
+from array import array
+from enviro.reading import Reading, Schema
+import enviro.gorilla as gorilla
+from phew import logging
+
+try:
+    import btree
+except ImportError:
+    btree = None
+
+# ================================================================
+# 🗃️ btree readings archive
+# ================================================================
+# readings keyed by epoch so time ranges are a bounded btree walk instead
+# of a scan over every file.
+#
+# new readings are stored as they come, once BLOCK_READINGS have piled up
+# they are folded into one Gorilla block (see gorilla.py), which takes a
+# fraction of the space of the raw records.
+#
+# keys:    4 byte big-endian epoch -> raw reading (sorts by time)
+#          0x00 'g' + epoch of its last reading -> compressed block
+#          0x00 's' id -> schema, "name:decimals" joined by commas
+# records: schema id byte + the reading's float32 values (NaN = unset)
+# blocks:  schema id byte + Gorilla block
+
+ARCHIVE_FILE = "archive.db"
+# small pages and a few of them cached keep the heap cost around 4 KB
+PAGE_SIZE = 1024
+CACHE_SIZE = 4 * 1024
+# raw readings folded into a block at a time, a day at the default 15 minutes
+BLOCK_READINGS = 96
+
+_KEY = ">I"
+_SCHEMA_PREFIX = b"\x00s"
+_BLOCK_PREFIX = b"\x00g"
+_BLOCK_END = b"\x00h"
+# first possible reading key, above the schema keys
+_FIRST_KEY = b"\x01"
+
+
+def _encode_fields(schema):
+    return ",".join(
+        "{}:{}".format(name, "" if decimals is None else decimals)
+        for name, decimals in zip(schema.names, schema.decimals)
+    )
+
+
+def _decode_fields(text):
+    fields = []
+    for field in text.split(","):
+        name, decimals = field.split(":")
+        fields.append((name, int(decimals) if decimals else None))
+    return fields
+
+
+class ReadingArchive:
+    def __init__(self, path=ARCHIVE_FILE, pagesize=PAGE_SIZE, cachesize=CACHE_SIZE, block_readings=BLOCK_READINGS):
+        if btree is None:
+            raise ImportError("btree module not available in this firmware")
+        try:
+            self._file = open(path, "r+b")
+        except OSError:
+            self._file = open(path, "w+b")
+        self._db = btree.open(self._file, pagesize=pagesize, cachesize=cachesize)
+        self.block_readings = block_readings
+
+        # schema id -> (encoded fields, record decoding into a Reading)
+        self._schemas = {}
+        for key, value in self._db.items(_SCHEMA_PREFIX, _FIRST_KEY):
+            if key.startswith(_SCHEMA_PREFIX) and len(key) == 3:
+                text = value.decode()
+                self._schemas[key[2]] = (text, Reading(Schema(_decode_fields(text))))
+
+        # raw readings not folded into a block yet
+        self._raw = 0
+        for _ in self._db.keys(_FIRST_KEY):
+            self._raw += 1
+
+    def close(self):
+        self._db.close()
+        self._file.close()
+
+    def _schema_id(self, schema):
+        text = _encode_fields(schema)
+        for schema_id, (stored, _) in self._schemas.items():
+            if stored == text:
+                return schema_id
+        schema_id = len(self._schemas)
+        if schema_id > 0xFF:
+            raise ValueError("too many reading layouts in the archive")
+        self._db[_SCHEMA_PREFIX + bytes([schema_id])] = text
+        self._schemas[schema_id] = (text, Reading(Schema(_decode_fields(text))))
+        logging.debug(f"  - archive layout {schema_id} stored")
+        return schema_id
+
+    def append(self, ts, reading):
+        """Store a Reading taken at epoch ts."""
+        self._db[struct.pack(_KEY, ts)] = bytes([self._schema_id(reading.schema)]) + bytes(reading.values)
+        self._raw += 1
+        if self._raw >= self.block_readings:
+            self.compact()
+        self._db.flush()
+
+    def compact(self):
+        """Fold the raw readings into Gorilla blocks, one per run of the same layout."""
+        blocks = []
+        keys = []
+        encoder = None
+        block_schema = None
+        last = None
+        for key, value in self._db.items(_FIRST_KEY):
+            if encoder is not None and value[0] != block_schema:
+                blocks.append((last, bytes([block_schema]) + encoder.getvalue()))
+                encoder = None
+            if encoder is None:
+                block_schema = value[0]
+                encoder = gorilla.Encoder((len(value) - 1) // 4)
+            last = key
+            encoder.append(struct.unpack(_KEY, key)[0], struct.unpack_from("<%dI" % encoder.fields, value, 1))
+            keys.append(key)
+        if encoder is not None:
+            blocks.append((last, bytes([block_schema]) + encoder.getvalue()))
+
+        # written before the raw readings go, so a power cut only leaves duplicates
+        for last, block in blocks:
+            self._db[_BLOCK_PREFIX + last] = block
+        for key in keys:
+            del self._db[key]
+        self._raw = 0
+        self._db.flush()
+        logging.debug(f"  - archive folded {len(keys)} reading(s) into {len(blocks)} block(s)")
+
+    def _range(self, start_ts, end_ts):
+        start = struct.pack(_KEY, start_ts) if start_ts is not None else _FIRST_KEY
+        end = struct.pack(_KEY, end_ts) if end_ts is not None else None
+        return start, end
+
+    def _blocks(self, start_ts):
+        """Blocks holding readings from start_ts on, keyed by their last epoch."""
+        start = _BLOCK_PREFIX
+        if start_ts is not None:
+            start += struct.pack(_KEY, start_ts)
+        return self._db.items(start, _BLOCK_END)
+
+    def items(self, start_ts=None, end_ts=None):
+        """
+        Yield (epoch, reading) for start_ts <= epoch < end_ts, oldest first.
+        The reading is reused between items, copy what you need to keep.
+        """
+        for _, block in self._blocks(start_ts):
+            schema = self._schemas.get(block[0])
+            if schema is None:
+                continue
+            reading = schema[1]
+            count = len(reading.values)
+            for ts, values in gorilla.decode(block, 1):
+                if end_ts is not None and ts >= end_ts:
+                    return
+                if (start_ts is not None and ts < start_ts) or len(values) != count:
+                    continue
+                data = struct.unpack("<%df" % count, array("I", values))
+                for i in range(count):
+                    reading.values[i] = data[i]
+                yield ts, reading
+
+        start, end = self._range(start_ts, end_ts)
+        for key, value in self._db.items(start, end):
+            schema = self._schemas.get(value[0])
+            if schema is None:
+                continue
+            reading = schema[1]
+            count = len(reading.values)
+            if len(value) != 1 + 4 * count:
+                continue
+            data = struct.unpack("<%df" % count, value[1:])
+            for i in range(count):
+                reading.values[i] = data[i]
+            yield struct.unpack(_KEY, key)[0], reading
+
+    def count(self, start_ts=None, end_ts=None):
+        total = 0
+        for _, block in self._blocks(start_ts):
+            count, _, first = gorilla.block_info(block, 1)
+            if end_ts is not None and first >= end_ts:
+                return total
+            if (start_ts is None or first >= start_ts) and end_ts is None:
+                total += count
+                continue
+            for ts, _ in gorilla.decode(block, 1):
+                if end_ts is not None and ts >= end_ts:
+                    return total
+                if start_ts is None or ts >= start_ts:
+                    total += 1
+
+        start, end = self._range(start_ts, end_ts)
+        for _ in self._db.keys(start, end):
+            total += 1
+        return total
+
+    def export(self, f, start_ts=None, end_ts=None):
+        """
+        Write the blocks holding readings between start_ts and end_ts to the
+        stream f, for tools/decode_archive.py. Blocks overlapping the range
+        are written whole, readings not folded yet are encoded on the way.
+        Each block: schema text length, block length (<HH), schema text, block.
+        """
+        written = 0
+        for _, block in self._blocks(start_ts):
+            if end_ts is not None and gorilla.block_info(block, 1)[2] >= end_ts:
+                break
+            written += self._export_block(f, block[0], block[1:])
+
+        start, end = self._range(start_ts, end_ts)
+        encoder = None
+        block_schema = None
+        for key, value in self._db.items(start, end):
+            if encoder is not None and value[0] != block_schema:
+                written += self._export_block(f, block_schema, encoder.getvalue())
+                encoder = None
+            if encoder is None:
+                block_schema = value[0]
+                encoder = gorilla.Encoder((len(value) - 1) // 4)
+            encoder.append(struct.unpack(_KEY, key)[0], struct.unpack_from("<%dI" % encoder.fields, value, 1))
+        if encoder is not None:
+            written += self._export_block(f, block_schema, encoder.getvalue())
+        return written
+
+    def _export_block(self, f, schema_id, block):
+        schema = self._schemas.get(schema_id)
+        if schema is None:
+            return 0
+        text = schema[0].encode()
+        f.write(struct.pack("<HH", len(text), len(block)))
+        f.write(text)
+        f.write(block)
+        return 1
+
+    def delete_before(self, ts, batch=32):
+        """Drop every reading older than ts, a batch of keys at a time to bound memory."""
+        deleted = 0
+        # whole blocks only, one straddling ts is kept until its last reading expires
+        deleted += self._delete_keys(_BLOCK_PREFIX, _BLOCK_PREFIX + struct.pack(_KEY, ts), batch)
+        raw = self._delete_keys(_FIRST_KEY, struct.pack(_KEY, ts), batch)
+        self._raw -= raw
+        deleted += raw
+        if deleted:
+            self._db.flush()
+        return deleted
+
+    def _delete_keys(self, start, end, batch):
+        deleted = 0
+        while True:
+            keys = []
+            for key in self._db.keys(start, end):
+                keys.append(key)
+                if len(keys) >= batch:
+                    break
+            if not keys:
+                break
+            for key in keys:
+                del self._db[key]
+            deleted += len(keys)
+        return deleted
@@ -1,12 +1,17 @@
-import time, math
-from breakout_bme280 import BreakoutBME280  # type: ignore
+import time, math, struct
 from breakout_ltr559 import BreakoutLTR559  # type: ignore
-from ucollections import OrderedDict
-from machine import Pin
-from pimoroni import Analog  # type: ignore
-import ujson
+from machine import Pin, ADC
 from enviro import i2c, leds_manager, config, constants
 import enviro.helpers as helpers
+from enviro.sample_ring import SampleRing
+import enviro.derived as derived
+from enviro.slot_file import SlotFile
+import enviro.state as state
+import enviro.config_store as config_store
+from enviro.wind_stats import WindStats, SAMPLE_MS, MAX_BACKFILL_SAMPLES, transitions_to_speed
+from bme280_forced import BME280
+import flash_stats
+import boot_profile
 from phew import logging
 
 # ================================================================
@@ -15,73 +20,273 @@ from phew import logging
 # amount of rain required for the bucket to tip in mm
 RAIN_MM_PER_TICK = 0.2794
 
-# distance from the centre of the anemometer to the centre
-# of one of the cups in cm
-WIND_CM_RADIUS = 7.0
-# scaling factor for wind speed in m/s
-WIND_FACTOR = 0.0218
-DAILY_STATS_FILE = "daily_stats.json"
+# daily statistics live in the state store, this is where older firmware kept them
+LEGACY_DAILY_STATS_FILE = "daily_stats.bin"
+# number of rain tips kept with their timestamp
+RAIN_EVENTS_SIZE = 190
+# per-day sample series, one slot per reading at the default 15 min frequency
+DAILY_SAMPLES_SIZE = 96
+# layout version, year, month, day, rain ticks, rain last count, rain log records folded,
+# wind gust, has dir state, ema x, ema y
+_DAILY_VERSION = 2
+_DAILY_HEADER = "<BHBBIIHfBff"
+_DAILY_HEADER_SIZE = struct.calcsize(_DAILY_HEADER)
+DAILY_RING_KEYS = ("rain_events", "temperature", "humidity")
+
+# append-only log of rain tips, one epoch timestamp per record
+RAIN_LOG_FILE = "rain_log.bin"
+_RAIN_LOG_RECORD = "<I"
+_RAIN_LOG_RECORD_SIZE = struct.calcsize(_RAIN_LOG_RECORD)
+# rewrite the log once this many folded tips have piled up (one 512 byte page)
+RAIN_LOG_COMPACT_AT = 128
+
+# sensors read during the sleep period and filtered at reporting time
+FAST_SENSOR_FIELDS = ("temperature", "humidity", "pressure", "luminance")
+FAST_SENSOR_RING_MAX = 64
+
+# fields this board writes into each reading, as (name, decimals)
+READING_FIELDS = (
+    ("temperature", 2),
+    ("humidity", 2),
+    ("pressure", 2),
+    ("luminance", 2),
+    ("wind_speed", 2),
+    ("wind_gust", 2),
+    ("wind_speed_10m", 2),
+    ("wind_gust_today", 2),
+    ("wind_direction", None),
+    ("wind_direction_confidence", 3),
+    ("rain", 4),
+    ("rain_per_second", 6),
+    ("rain_per_hour", 4),
+    ("rain_today", 3),
+    ("temperature_avg", 2),
+    ("temperature_min", 2),
+    ("temperature_max", 2),
+    ("humidity_avg", 2),
+    ("humidity_min", 2),
+    ("humidity_max", 2),
+) + tuple((name + suffix, 2) for name in FAST_SENSOR_FIELDS for suffix in ("_window_min", "_window_max"))
 
 _daily_stats_cache = None
 _daily_dirty = False
-_last_rain_flush_ms = 0
-bme280 = BreakoutBME280(i2c, constants.I2C_ADDR_BME280)
-ltr559 = BreakoutLTR559(i2c)
+_sensor_rings = None
+_sensor_last_sample_ms = None
 
-wind_direction_pin = Analog(constants.WIND_DIRECTION_PIN)
+
+def _init_bme280():
+    oversampling = config.bme280_oversampling
+    iir_filter = config.bme280_iir_filter
+    try:
+        return BME280(i2c, constants.I2C_ADDR_BME280, oversampling, oversampling, oversampling, iir_filter)
+    except ValueError as e:
+        logging.warn(f"  - {e}, using default BME280 settings")
+        return BME280(i2c, constants.I2C_ADDR_BME280)
+
+
+# the sensors are set up on first use, wakes that only log rain or wind never touch them
+_bme280 = None
+_ltr559 = None
+
+
+def get_bme280():
+    global _bme280
+    if _bme280 is None:
+        _bme280 = _init_bme280()
+    return _bme280
+
+
+def get_ltr559():
+    global _ltr559
+    if _ltr559 is None:
+        _ltr559 = BreakoutLTR559(i2c)
+    return _ltr559
+
+
+def _reconfigure_bme280(changes):
+    global _bme280
+    _bme280 = None
+
+
+config_store.subscribe(("bme280_oversampling", "bme280_iir_filter"), _reconfigure_bme280)
+
+wind_direction_pin = ADC(constants.WIND_DIRECTION_PIN)
 wind_speed_pin = Pin(constants.WIND_SPEED_PIN, Pin.IN, Pin.PULL_UP)
 rain_pin = Pin(constants.RAIN_PIN, Pin.IN, Pin.PULL_DOWN)
 last_rain_trigger = False
+boot_profile.mark("weather pins")
+
+wind_stats = WindStats()
+_wind_transitions = 0
+_wind_last_transitions = 0
+_wind_last_sample_ms = time.ticks_ms()
+
+
+# wind vane output voltage for each 22.5° step, indexed by step
+WIND_DIRECTION_VOLTAGES = (
+    2.533,
+    1.308,
+    1.487,
+    0.270,
+    0.300,
+    0.212,
+    0.595,
+    0.408,
+    0.926,
+    0.789,
+    2.031,
+    1.932,
+    3.046,
+    2.667,
+    2.859,
+    2.265,
+)
+
+
+def _build_direction_table():
+    """
+    Sort the vane voltages and convert the midpoints between neighbours
+    into raw read_u16 thresholds, so classifying a sample is a bisect.
+    """
+    order = sorted(range(16), key=lambda i: WIND_DIRECTION_VOLTAGES[i])
+    thresholds = []
+    for a, b in zip(order, order[1:]):
+        midpoint = (WIND_DIRECTION_VOLTAGES[a] + WIND_DIRECTION_VOLTAGES[b]) / 2.0
+        thresholds.append(int(midpoint * 65535 / 3.3))
+    vectors = [helpers.deg_to_vec(i * 22.5) for i in order]
+    return tuple(thresholds), tuple(vectors)
+
+
+_dir_thresholds, _dir_vectors = _build_direction_table()
+# speed-weighted and unweighted (calm) unit-vector sums since last reading
+_dir_sum_x = _dir_sum_y = _dir_sum_w = 0.0
+_dir_calm_x = _dir_calm_y = 0.0
+_dir_samples = 0
+
+
+def _wind_irq(pin):
+    global _wind_transitions
+    _wind_transitions += 1
+
+
+wind_speed_pin.irq(trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING, handler=_wind_irq)
 
 # ================================================================
 # 📊 Unified Daily Statistics System
 # ================================================================
 
 
-def load_daily_stats():
-    global _daily_stats_cache
-    if _daily_stats_cache is not None and _daily_stats_cache.get("date") == helpers.date_string():
-        return _daily_stats_cache
+def _daily_record_size():
+    template = _new_daily_stats("")
+    return _DAILY_HEADER_SIZE + sum(template[key].blob_size() for key in DAILY_RING_KEYS)
 
-    """Load or create daily statistics JSON file."""
-    today = helpers.date_string()
-    base = {
+
+def _new_daily_stats(today):
+    return {
         "date": today,
         "rain_ticks": 0,
         "rain_total_mm": 0.0,
-        "rain_events": [],  # NEW: timestamps (ISO strings) for per-hour calc
-        "rain_last_count": 0,  # NEW: tick counter at last reading (to get delta)
+        "rain_events": SampleRing(RAIN_EVENTS_SIZE, "I"),  # epoch of each tip for per-hour calc
+        "rain_last_count": 0,  # tick counter at last reading (to get delta)
+        "rain_log_folded": 0,  # rain log records already included in this snapshot
         "wind_gust": 0.0,
-        "wind_samples": [],
-        "temperature": {"min": 999.0, "max": -999.0, "sum": 0.0, "count": 0},
-        "humidity": {"min": 999.0, "max": -999.0, "sum": 0.0, "count": 0},
+        "temperature": SampleRing(DAILY_SAMPLES_SIZE),
+        "humidity": SampleRing(DAILY_SAMPLES_SIZE),
     }
 
-    if helpers.file_exists(DAILY_STATS_FILE):
-        try:
-            with open(DAILY_STATS_FILE, "r") as f:
-                data = ujson.load(f)
-            if data.get("date") == today:
-                base.update(data)
+
+_DAILY_RECORD_SIZE = _daily_record_size()
+state.declare("daily_stats", state.BLOB)
+
+
+def _pack_daily_stats(data):
+    """Fixed-layout binary record: scalar header followed by the ring blobs."""
+    date = data["date"]
+    dir_state = data.get("wind_dir_state")
+    header = struct.pack(
+        _DAILY_HEADER,
+        _DAILY_VERSION,
+        int(date[0:4]),
+        int(date[5:7]),
+        int(date[8:10]),
+        data["rain_ticks"],
+        data["rain_last_count"],
+        data["rain_log_folded"],
+        data["wind_gust"],
+        1 if dir_state else 0,
+        dir_state["ema_x"] if dir_state else 0.0,
+        dir_state["ema_y"] if dir_state else 0.0,
+    )
+    return header + b"".join(data[key].to_bytes() for key in DAILY_RING_KEYS)
+
+
+def _unpack_daily_stats(blob):
+    (version, year, month, day, rain_ticks, rain_last_count, rain_log_folded, wind_gust, has_dir, ema_x, ema_y) = (
+        struct.unpack(_DAILY_HEADER, blob[:_DAILY_HEADER_SIZE])
+    )
+    if version != _DAILY_VERSION or len(blob) != _DAILY_RECORD_SIZE:
+        raise ValueError("unknown daily stats layout")
+    data = _new_daily_stats("{0:04d}-{1:02d}-{2:02d}".format(year, month, day))
+    data["rain_ticks"] = rain_ticks
+    data["rain_total_mm"] = rain_ticks * RAIN_MM_PER_TICK
+    data["rain_last_count"] = rain_last_count
+    data["rain_log_folded"] = rain_log_folded
+    data["wind_gust"] = wind_gust
+    if has_dir:
+        data["wind_dir_state"] = {"ema_x": ema_x, "ema_y": ema_y}
+
+    offset = _DAILY_HEADER_SIZE
+    for key in DAILY_RING_KEYS:
+        size = data[key].blob_size()
+        data[key] = SampleRing.from_bytes(blob[offset : offset + size])
+        offset += size
+    return data
+
+
+def load_daily_stats():
+    global _daily_stats_cache
+    if _daily_stats_cache is not None and _daily_stats_cache.get("date") == helpers.date_string():
+        return _daily_stats_cache
+
+    """Load the newest valid daily statistics record or start a new one."""
+    today = helpers.date_string()
+    base = None
+
+    try:
+        blob = state.store.get("daily_stats")
+        migrated = blob is None and helpers.file_exists(LEGACY_DAILY_STATS_FILE)
+        if migrated:
+            blob = SlotFile(LEGACY_DAILY_STATS_FILE, _DAILY_RECORD_SIZE).load()
+            flash_stats.remove(LEGACY_DAILY_STATS_FILE)
+        if blob is not None:
+            data = _unpack_daily_stats(blob)
+            if data["date"] == today:
+                base = data
+                if migrated:
+                    mark_dirty()
             else:
                 logging.debug("> new day detected — resetting daily stats.")
-                save_daily_stats(base)
-        except Exception as e:
-            logging.error(f"! failed to read {DAILY_STATS_FILE}: {e}")
-            save_daily_stats(base)
-    else:
+    except Exception as e:
+        logging.error(f"! failed to read daily stats: {e}")
+
+    rollover = base is None
+    if rollover:
+        base = _new_daily_stats(today)
         save_daily_stats(base)
 
+    # replay tips logged since the snapshot was written
+    fold_rain_log(base, compact=rollover)
+
     _daily_stats_cache = base
     return base
 
 
 def save_daily_stats(data):
-    global _daily_stats_cache
-    """Save stats to JSON file."""
+    global _daily_stats_cache, _daily_dirty
+    """Put the stats in the state store, written with the rest of the cycle's state."""
     _daily_stats_cache = data
-    with open(DAILY_STATS_FILE, "w") as f:
-        ujson.dump(data, f)
+    state.store.set("daily_stats", _pack_daily_stats(data))
+    _daily_dirty = False
 
 
 def load_dir_state():
@@ -111,9 +316,7 @@ def save_daily_stats_if_needed(force=False):
         return
     if not _daily_dirty and not force:
         return
-    with open(DAILY_STATS_FILE, "w") as f:
-        ujson.dump(_daily_stats_cache, f)
-    _daily_dirty = False
+    save_daily_stats(_daily_stats_cache)
 
 
 def startup(reason):
@@ -161,29 +364,57 @@ def check_trigger():
 
 
 def log_rain():
-    global _last_rain_flush_ms
-    """Add one rain bucket tip, store timestamp, and update totals."""
-    data = load_daily_stats()
+    """Append one rain bucket tip to the tip log (a single 4 byte write)."""
+    with flash_stats.open(RAIN_LOG_FILE, "ab") as f:
+        f.write(struct.pack(_RAIN_LOG_RECORD, helpers.timestamp(helpers.datetime_string())))
 
-    data["rain_ticks"] += 1
-    data["rain_total_mm"] = data["rain_ticks"] * RAIN_MM_PER_TICK
+    logging.debug("> rain tick recorded")
 
-    # append timestamp for per-hour computation
-    ts = helpers.datetime_string()
-    events = data.get("rain_events", [])
-    events.append(ts)
-    # keep at most ~190 events (fits < one FS block comfortably)
-    if len(events) > 190:
-        events = events[-190:]
-    data["rain_events"] = events
-    mark_dirty()
 
-    now = time.ticks_ms()
-    if time.ticks_diff(now, _last_rain_flush_ms) > 5000:
-        save_daily_stats_if_needed(force=True)
-        _last_rain_flush_ms = now
+def _read_rain_log():
+    """Return the tip timestamps in the log (a torn trailing record is ignored)."""
+    try:
+        with open(RAIN_LOG_FILE, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return []
+    count = len(raw) // _RAIN_LOG_RECORD_SIZE
+    return struct.unpack("<%dI" % count, raw[: count * _RAIN_LOG_RECORD_SIZE])
 
-    logging.debug(f"> rain tick recorded ({data['rain_total_mm']} mm total)")
+
+def fold_rain_log(data, compact=False):
+    """
+    Fold tips logged since the last fold into the daily snapshot and save it.
+    Tips from before the snapshot's day are skipped. Once the snapshot
+    accounts for the whole log, the log is compacted on rollover or when it
+    grows past RAIN_LOG_COMPACT_AT records.
+    """
+    tips = _read_rain_log()
+    folded = data["rain_log_folded"]
+    if len(tips) < folded:
+        # the log was compacted after this snapshot was written
+        folded = 0
+
+    day_start = helpers.timestamp(data["date"] + "T00:00:00Z")
+    for ts in tips[folded:]:
+        if ts >= day_start:
+            data["rain_ticks"] += 1
+            data["rain_events"].push(ts)
+    data["rain_total_mm"] = data["rain_ticks"] * RAIN_MM_PER_TICK
+    data["rain_log_folded"] = len(tips)
+
+    if len(tips) != folded:
+        save_daily_stats(data)
+
+    if tips and (compact or len(tips) >= RAIN_LOG_COMPACT_AT):
+        # the folded tips must be on flash before their log goes
+        state.store.flush()
+        try:
+            flash_stats.remove(RAIN_LOG_FILE)
+        except OSError:
+            pass
+        data["rain_log_folded"] = 0
+        mark_dirty()
 
 
 # ================================================================
@@ -191,46 +422,68 @@ def log_rain():
 # ================================================================
 
 
-def wind_speed(sample_time_ms=1000):
-    """Measure current wind speed in m/s."""
-    state = wind_speed_pin.value()
-    first = last = 0
-    transitions = 0
-    start = time.ticks_ms()
+def sample_wind():
+    """
+    Push anemometer samples at a fixed SAMPLE_MS cadence.
+    Pulses are counted by the pin IRQ, so any periods missed while the
+    main loop was busy are back-filled with the average speed over the gap.
+    """
+    global _wind_last_transitions, _wind_last_sample_ms
+    now = time.ticks_ms()
+    elapsed = time.ticks_diff(now, _wind_last_sample_ms)
+    periods = elapsed // SAMPLE_MS
+    if periods <= 0:
+        return
+
+    transitions = _wind_transitions
+    delta = transitions - _wind_last_transitions
+    _wind_last_transitions = transitions
+    _wind_last_sample_ms = time.ticks_add(_wind_last_sample_ms, periods * SAMPLE_MS)
+
+    speed = transitions_to_speed(delta, periods * SAMPLE_MS)
+    for _ in range(min(periods, MAX_BACKFILL_SAMPLES)):
+        wind_stats.add_sample(speed)
+    sample_wind_direction(speed * periods)
 
-    while time.ticks_diff(time.ticks_ms(), start) <= sample_time_ms:
-        new_state = wind_speed_pin.value()
-        if new_state != state:
-            tick_time = time.ticks_ms()
-            if first is None:
-                first = tick_time
-            last = tick_time
-            transitions += 1
-            state = new_state
 
-    if transitions < 2 or first == last:
-        return 0.0
+def sample_wind_direction(weight):
+    """Classify one raw vane sample and add it to the direction vector sums."""
+    global _dir_sum_x, _dir_sum_y, _dir_sum_w, _dir_calm_x, _dir_calm_y, _dir_samples
+    vx, vy = _dir_vectors[helpers.bisect_right(_dir_thresholds, wind_direction_pin.read_u16())]
+    _dir_samples += 1
+    _dir_calm_x += vx
+    _dir_calm_y += vy
+    if weight > 0.0:
+        _dir_sum_x += vx * weight
+        _dir_sum_y += vy * weight
+        _dir_sum_w += weight
 
-    avg_tick_ms = time.ticks_diff(last, first) / (transitions - 1)
-    if avg_tick_ms == 0:
-        return 0.0
 
-    rotation_hz = (1000.0 / avg_tick_ms) / 2.0
-    circumference = WIND_CM_RADIUS * 2.0 * math.pi
-    return rotation_hz * circumference * WIND_FACTOR
+def fill_wind_gust_window():
+    """Block until at least one full 3 s gust window has been sampled."""
+    while wind_stats.gust.count < wind_stats.gust.size:
+        time.sleep_ms(SAMPLE_MS)
+        sample_wind()
 
 
-def update_wind_stats(current_speed):
-    """Update average and max gust in daily stats."""
+def update_wind_stats():
+    """
+    Close the current reporting period.
+    Returns (2 min mean, 10 min mean, highest 3 s gust since last reading,
+    highest 3 s gust today).
+    """
+    sample_wind()
     data = load_daily_stats()
-    data["wind_samples"].append(current_speed)
-    if len(data["wind_samples"]) > 50:
-        data["wind_samples"] = data["wind_samples"][-50:]
-    if current_speed > data.get("wind_gust", 0):
-        data["wind_gust"] = round(current_speed, 2)
-    mark_dirty()
-    avg_speed = sum(data["wind_samples"]) / len(data["wind_samples"])
-    return round(avg_speed, 2), data["wind_gust"]
+    gust = wind_stats.take_period_gust()
+    if gust > data.get("wind_gust", 0):
+        data["wind_gust"] = round(gust, 2)
+        mark_dirty()
+    return (
+        round(wind_stats.mean_2min(), 2),
+        round(wind_stats.mean_10min(), 2),
+        round(gust, 2),
+        data["wind_gust"],
+    )
 
 
 # ================================================================
@@ -243,7 +496,7 @@ def smooth_direction(dir_deg, speed_mps, alpha_base=0.25, min_speed=0.8, hystere
     Speed-weighted exponential moving average for wind direction.
     - Ignores updates when speed is below min_speed (too turbulent).
     - Applies hysteresis: if change is small and speed is low, skip.
-    - Persists EMA state in daily_stats.json.
+    - Persists EMA state in the daily_stats blob of state.store.
     Returns (smoothed_dir_deg, confidence_0_1).
     """
     state = load_dir_state()
@@ -281,32 +534,121 @@ def smooth_direction(dir_deg, speed_mps, alpha_base=0.25, min_speed=0.8, hystere
 
 
 def wind_direction():
-    ADC_TO_DEGREES = (
-        2.533,
-        1.308,
-        1.487,
-        0.270,
-        0.300,
-        0.212,
-        0.595,
-        0.408,
-        0.926,
-        0.789,
-        2.031,
-        1.932,
-        3.046,
-        2.667,
-        2.859,
-        2.265,
-    )
+    """
+    Speed-weighted unit-vector mean of the direction samples taken since
+    the last call (falls back to an unweighted mean in calm conditions).
+    """
+    global _dir_sum_x, _dir_sum_y, _dir_sum_w, _dir_calm_x, _dir_calm_y, _dir_samples
+    if not _dir_samples:
+        sample_wind_direction(0.0)
+
+    if _dir_sum_w > 0.0:
+        wind_dir = helpers.vec_to_deg(_dir_sum_x, _dir_sum_y)
+    else:
+        wind_dir = helpers.vec_to_deg(_dir_calm_x, _dir_calm_y)
+
+    _dir_sum_x = _dir_sum_y = _dir_sum_w = 0.0
+    _dir_calm_x = _dir_calm_y = 0.0
+    _dir_samples = 0
 
-    value = wind_direction_pin.read_voltage()
-    closest_index = min(range(16), key=lambda i: abs(ADC_TO_DEGREES[i] - value))
-    wind_dir = closest_index * 22.5
     offset = getattr(config, "wind_direction_offset", 0.0)
     return (wind_dir + 360.0 + offset) % 360.0
 
 
+# ================================================================
+# 🌡️ Fast Sensor Sampling
+# ================================================================
+
+
+def _read_fast_sensors():
+    # forced mode: one conversion, done when the status register says so
+    return _fast_sensor_values(get_bme280().read())
+
+
+def _fast_sensor_values(bme280_data):
+    ltr_data = get_ltr559().get_reading()
+    return {
+        "temperature": bme280_data[0],
+        "humidity": bme280_data[2],
+        "pressure": bme280_data[1] / 100.0,
+        "luminance": ltr_data[BreakoutLTR559.LUX],
+    }
+
+
+def _sensor_ring_size():
+    interval = config.sensor_sample_interval
+    if interval <= 0:
+        return 1
+    return max(1, min(FAST_SENSOR_RING_MAX, int(config.reading_frequency * 60 // interval) + 1))
+
+
+def _resize_sensor_rings(changes):
+    # the current window is dropped, the next sample starts one of the new size
+    global _sensor_rings
+    _sensor_rings = None
+
+
+config_store.subscribe(("sensor_sample_interval", "reading_frequency"), _resize_sensor_rings)
+
+
+def start_readings():
+    """Trigger the BME280 conversion for a reading, polled with poll_readings()."""
+    get_bme280().start()
+    return time.ticks_us()
+
+
+def poll_readings(started_us):
+    """Fast sensor values once the conversion started by start_readings() is done, else None."""
+    bme280 = get_bme280()
+    if time.ticks_diff(time.ticks_us(), started_us) < bme280.measurement_time_us(maximum=False):
+        return None
+    if not bme280.ready():
+        return None
+    return _fast_sensor_values(bme280.read_result())
+
+
+def sample_sensors(force=False, values=None):
+    """
+    Read the fast sensors into their sample rings every
+    config.sensor_sample_interval seconds (or right away when forced).
+    values, when given, is a sample already acquired by poll_readings().
+    """
+    global _sensor_rings, _sensor_last_sample_ms
+    now = time.ticks_ms()
+    if not force:
+        if config.sensor_sample_interval <= 0:
+            return
+        elapsed = time.ticks_diff(now, _sensor_last_sample_ms) if _sensor_last_sample_ms is not None else None
+        if elapsed is not None and elapsed < config.sensor_sample_interval * 1000:
+            return
+
+    if _sensor_rings is None:
+        size = _sensor_ring_size()
+        _sensor_rings = {name: SampleRing(size) for name in FAST_SENSOR_FIELDS}
+
+    if values is None:
+        values = _read_fast_sensors()
+    for name in FAST_SENSOR_FIELDS:
+        _sensor_rings[name].push(values[name])
+    _sensor_last_sample_ms = now
+
+
+def take_sensor_window():
+    """
+    Close the sampling window.
+    Returns {field: (filtered value, window min, window max)} and resets the rings.
+    """
+    trimmed = config.sensor_sample_filter == "trimmed_mean"
+    window = {}
+    for name in FAST_SENSOR_FIELDS:
+        ring = _sensor_rings[name]
+        values = ring.values()
+        value = helpers.trimmed_mean(values) if trimmed else helpers.median(values)
+        window[name] = (value, ring.min, ring.max)
+        ring.reset()
+    return window
+
+
 # ================================================================
 # 🌧️ Rain Summary
 # ================================================================
@@ -321,6 +663,7 @@ def rainfall(seconds_since_last):
       today (mm total today)
     """
     data = load_daily_stats()
+    fold_rain_log(data)
 
     ticks_now = data.get("rain_ticks", 0)
     last_count = data.get("rain_last_count", ticks_now)
@@ -336,18 +679,13 @@ def rainfall(seconds_since_last):
 
     # mm in last 3600s window, using timestamped events
     per_hour = 0.0
-    events = data.get("rain_events", [])
-    if events:
-        now_ts = helpers.timestamp(helpers.datetime_string())
-        one_hour_ago = now_ts - 3600
+    events = data["rain_events"]
+    if len(events):
+        one_hour_ago = helpers.timestamp(helpers.datetime_string()) - 3600
         tips_last_hour = 0
-        for iso in events:
-            try:
-                t = helpers.timestamp(iso)
-                if t >= one_hour_ago:
-                    tips_last_hour += 1
-            except Exception:
-                pass
+        for t in events.values():
+            if t >= one_hour_ago:
+                tips_last_hour += 1
         per_hour = round(tips_last_hour * RAIN_MM_PER_TICK, 4)
 
     # total today in mm
@@ -405,6 +743,13 @@ def estimate_pollen_index(temperature, humidity, wind_speed, rain_today, luminan
     return int(score)
 
 
+derived.register(
+    "pollen_index",
+    ("temperature", "humidity", "wind_speed", "rain_today", "luminance"),
+    estimate_pollen_index,
+)
+
+
 # ================================================================
 # 🌡️ Temperature and Humidity Tracking
 # ================================================================
@@ -414,18 +759,11 @@ def update_temp_humidity_stats(temp, hum):
     """Update daily min, max, and average for temperature and humidity."""
     data = load_daily_stats()
 
-    for key, value in [("temperature", temp), ("humidity", hum)]:
-        stats = data[key]
-        stats["min"] = min(stats["min"], value)
-        stats["max"] = max(stats["max"], value)
-        stats["sum"] += value
-        stats["count"] += 1
-        data[key] = stats
+    data["temperature"].push(temp)
+    data["humidity"].push(hum)
 
     mark_dirty()
-    return round(data["temperature"]["sum"] / data["temperature"]["count"], 2), round(
-        data["humidity"]["sum"] / data["humidity"]["count"], 2
-    )
+    return round(data["temperature"].total_mean(), 2), round(data["humidity"].total_mean(), 2)
 
 
 # ================================================================
@@ -433,56 +771,51 @@ def update_temp_humidity_stats(temp, hum):
 # ================================================================
 
 
-def get_sensor_readings(seconds_since_last, is_usb_power):
-    bme280.read()
-    time.sleep(0.1)
-    bme280_data = bme280.read()
-    ltr_data = ltr559.get_reading()
+def get_sensor_readings(seconds_since_last, is_usb_power, reading, sample=None):
+    """Write this reading's board values into the reading record."""
+    # always finish the window with a fresh sample taken at reporting time
+    sample_sensors(force=True, values=sample)
+    window = take_sensor_window()
     rain, rain_per_second, rain_per_hour, rain_today = rainfall(seconds_since_last)
 
-    pressure = bme280_data[1] / 100.0
-    temperature = bme280_data[0]
-    humidity = bme280_data[2]
+    temperature = window["temperature"][0]
+    humidity = window["humidity"][0]
+    pressure = window["pressure"][0]
+    luminance = window["luminance"][0]
 
     avg_temp, avg_hum = update_temp_humidity_stats(temperature, humidity)
 
-    current_wind = wind_speed()
-    avg_wind, gust_wind = update_wind_stats(current_wind)
+    fill_wind_gust_window()
+    avg_wind, avg_wind_10m, gust_wind, gust_today = update_wind_stats()
     raw_wind_dir = wind_direction()
     smoothed_dir, dir_conf = smooth_direction(raw_wind_dir, avg_wind)
     daily_stats = load_daily_stats()
 
-    readings = OrderedDict(
-        {
-            "temperature": round(temperature, 2),
-            "humidity": round(humidity, 2),
-            "pressure": round(pressure, 2),
-            "luminance": round(ltr_data[BreakoutLTR559.LUX], 2),
-            "wind_speed": avg_wind,
-            "wind_gust": gust_wind,
-            "wind_direction": smoothed_dir,
-            "wind_direction_confidence": round(dir_conf, 3),
-            # ✅ Rain metrics restored
-            "rain": round(rain, 4),
-            "rain_per_second": round(rain_per_second, 6),
-            "rain_per_hour": round(rain_per_hour, 4),
-            "rain_today": round(rain_today, 3),
-            "dewpoint": round(helpers.calculate_dewpoint(temperature, humidity), 2),
-            "temperature_avg": avg_temp,
-            "temperature_min": round(daily_stats["temperature"]["min"], 2),
-            "temperature_max": round(daily_stats["temperature"]["max"], 2),
-            "humidity_avg": avg_hum,
-            "humidity_min": round(daily_stats["humidity"]["min"], 2),
-            "humidity_max": round(daily_stats["humidity"]["max"], 2),
-            "pollen_index": estimate_pollen_index(
-                temperature,
-                humidity,
-                avg_wind,
-                rain_today,
-                ltr_data[BreakoutLTR559.LUX],
-            ),
-        }
-    )
+    reading["temperature"] = temperature
+    reading["humidity"] = humidity
+    reading["pressure"] = pressure
+    reading["luminance"] = luminance
+    reading["wind_speed"] = avg_wind
+    reading["wind_gust"] = gust_wind
+    reading["wind_speed_10m"] = avg_wind_10m
+    reading["wind_gust_today"] = gust_today
+    reading["wind_direction"] = smoothed_dir
+    reading["wind_direction_confidence"] = dir_conf
+    reading["rain"] = rain
+    reading["rain_per_second"] = rain_per_second
+    reading["rain_per_hour"] = rain_per_hour
+    reading["rain_today"] = rain_today
+    reading["temperature_avg"] = avg_temp
+    reading["temperature_min"] = daily_stats["temperature"].min
+    reading["temperature_max"] = daily_stats["temperature"].max
+    reading["humidity_avg"] = avg_hum
+    reading["humidity_min"] = daily_stats["humidity"].min
+    reading["humidity_max"] = daily_stats["humidity"].max
+
+    # in-window extremes of the oversampled sensors
+    for name in FAST_SENSOR_FIELDS:
+        reading[name + "_window_min"] = window[name][1]
+        reading[name + "_window_max"] = window[name][2]
 
     save_daily_stats_if_needed()
-    return readings
+    return reading
@@ -1,75 +1,77 @@
 import config
 from phew import logging
 
-DEFAULT_USB_POWER_TEMPERATURE_OFFSET = 4.5
-DEFAULT_SECONDARY_DESTINATION = None
-DEFAULT_WIND_DIRECTION_OFFSET = 0
-DEFAULT_UTC_OFFSET = 0
-DEFAULT_UK_BST = True
+NONE = type(None)
+NUMBER = (int, float)
 
+# every setting a config.py from an older release may be missing, checked in
+# one pass at boot: (name, accepted types, default, allowed values or None)
+SCHEMA = (
+    ("reading_frequency", NUMBER, 15, None),
+    ("upload_frequency", (int,), 5, None),
+    ("resync_frequency", NUMBER, 168, None),
+    ("mqtt_broker_ca_file", (str, NONE), None, None),
+    ("wind_direction_offset", NUMBER, 0, None),
+    ("wifi_country", (str,), "GB", None),
+    ("wunderground_id", (str, NONE), None, None),
+    ("wunderground_key", (str, NONE), None, None),
+    ("secondary_destination", (str, NONE), None, None),
+    ("hass_discovery", (bool,), False, None),
+    ("hass_discovery_triggered", (bool,), False, None),
+    ("sensor_sample_interval", NUMBER, 30, None),
+    ("sensor_sample_filter", (str,), "median", ("median", "trimmed_mean")),
+    ("bme280_oversampling", (int,), 1, (1, 2, 4, 8, 16)),
+    ("bme280_iir_filter", (int,), 0, (0, 2, 4, 8, 16)),
+    ("scd41_mode", (str,), "periodic", ("periodic", "low_power", "single_shot")),
+    ("ltr390_gain", (int,), 9, (1, 3, 6, 9, 18)),
+    ("ltr390_resolution", (int,), 18, (13, 16, 17, 18, 19, 20)),
+    ("ltr390_auto_gain", (bool,), True, None),
+    ("derived_metrics", (list, tuple), ["dewpoint", "pollen_index"], None),
+    ("altitude", NUMBER + (NONE,), None, None),
+    ("archive_period", (str,), "day", ("hour", "day", "month")),
+    ("archive_flush_every", (int,), 4, None),
+    ("archive_max_bytes", (int,), 256 * 1024, None),
+    ("reading_archive", (bool,), False, None),
+    # packed as an unsigned int key by the archive
+    ("reading_archive_days", (int,), 30, None),
+    ("i2c_devices_cached", (list, tuple), [35, 81, 119], None),
+    ("boot_profile", (bool,), False, None),
+    ("boot_profile_publish", (bool,), False, None),
+)
 
-def add_missing_config_settings():
-    try:
-        # check if ca file parameter is set, if not set it to not use SSL by setting to None
-        config.mqtt_broker_ca_file
-    except AttributeError:
-        warn_missing_config_setting("mqtt_broker_ca_file")
-        config.mqtt_broker_ca_file = None
-
-    try:
-        config.wind_direction_offset
-    except AttributeError:
-        warn_missing_config_setting("wind_direction_offset")
-        config.wind_direction_offset = DEFAULT_WIND_DIRECTION_OFFSET
-
-    try:
-        config.wifi_country
-    except AttributeError:
-        warn_missing_config_setting("wifi_country")
-        config.wifi_country = "GB"
-
-    try:
-        config.wunderground_id
-    except AttributeError:
-        warn_missing_config_setting("wunderground_id")
-        config.wunderground_id = None
+_ENTRIES = {entry[0]: entry for entry in SCHEMA}
 
-    try:
-        config.wunderground_key
-    except AttributeError:
-        warn_missing_config_setting("wunderground_key")
-        config.wunderground_key = None
 
-    try:
-        config.secondary_destination
-    except AttributeError:
-        warn_missing_config_setting("secondary_destination")
-        config.secondary_destination = DEFAULT_SECONDARY_DESTINATION
+def check_setting(name, value):
+    """True when value is acceptable for name, settings outside SCHEMA always are."""
+    entry = _ENTRIES.get(name)
+    if entry is None:
+        return True
+    _, types, _, allowed = entry
+    # bool is an int subclass, only take it where the schema asks for one
+    if isinstance(value, bool) and bool not in types:
+        return False
+    return isinstance(value, types) and (allowed is None or value in allowed)
 
-    try:
-        config.hass_discovery
-    except AttributeError:
-        warn_missing_config_setting("hass_discovery")
-        config.hass_discovery = False
-
-    try:
-        config.hass_discovery_triggered
-    except AttributeError:
-        warn_missing_config_setting("hass_discovery_triggered")
-        config.hass_discovery_triggered = False
-
-    try:
-        config.wind_direction_offset
-    except AttributeError:
-        warn_missing_config_setting("wind_direction_offset")
-        config.wind_direction_offset = 0.0
-
-    try:
-        config.i2c_devices_cached
-    except AttributeError:
-        warn_missing_config_setting("i2c_devices_cached")
-        config.i2c_devices_cached = [35, 81, 119]
 
+def add_missing_config_settings():
+    """
+    Fill in missing settings with their defaults and check every setting in
+    SCHEMA. Missing settings are reported in a single log line, invalid ones
+    raise ValueError so the station stops before using them.
+    """
+    missing = []
+    invalid = []
+    for name, types, default, allowed in SCHEMA:
+        if not hasattr(config, name):
+            missing.append(name)
+            setattr(config, name, list(default) if isinstance(default, list) else default)
+            continue
+        value = getattr(config, name)
+        if not check_setting(name, value):
+            invalid.append(f"{name} = {repr(value)}")
 
-def warn_missing_config_setting(setting):
-    logging.warn(f"> config setting '{setting}' missing, please add it to config.py")
+    if missing:
+        logging.warn(f"> config setting(s) {', '.join(missing)} missing, please add them to config.py")
+    if invalid:
+        raise ValueError(f"invalid config setting(s): {', '.join(invalid)}")
@@ -0,0 +1,124 @@
+import os, ujson
+import config
+import flash_stats
+from phew import logging
+from enviro.config_defaults import check_setting
+
+# ================================================================
+# ⚙️ Config overlay store
+# ================================================================
+# settings changed at runtime are kept in a small json overlay instead of
+# rewriting config.py. the overlay is applied on top of config.py at boot,
+# updates set several keys at once and are persisted in a single atomic
+# write, then the subscribers of the changed keys are told so they can pick
+# the new values up without a reboot.
+
+OVERLAY_FILE = "config_overlay.json"
+_OVERLAY_TMP = OVERLAY_FILE + ".tmp"
+
+_overlay = {}
+# (names, callback taking the dict of changed settings)
+_subscribers = []
+
+
+def _recover():
+    """Finish or drop a save that was cut short by a reset."""
+    try:
+        os.stat(_OVERLAY_TMP)
+    except OSError:
+        return
+    try:
+        os.stat(OVERLAY_FILE)
+    except OSError:
+        # the old overlay was already gone, the new one is complete
+        os.rename(_OVERLAY_TMP, OVERLAY_FILE)
+        return
+    # the old overlay is intact, the new one may not be
+    os.remove(_OVERLAY_TMP)
+
+
+def load():
+    """Apply the persisted overlay to the config module, done once at boot."""
+    global _overlay
+    try:
+        _recover()
+    except OSError as e:
+        logging.error(f"! failed to recover {OVERLAY_FILE}: {e}")
+    try:
+        with open(OVERLAY_FILE, "r") as f:
+            _overlay = ujson.load(f)
+    except OSError:
+        _overlay = {}
+        return
+    except ValueError as e:
+        logging.error(f"! ignoring corrupt {OVERLAY_FILE}: {e}")
+        _overlay = {}
+        return
+
+    for name, value in _overlay.items():
+        setattr(config, name, value)
+
+
+def subscribe(names, callback):
+    """Call callback(changes) after an update that changed any of names."""
+    _subscribers.append((names, callback))
+
+
+def _save(overlay):
+    # flash_stats files are not native streams, so no ujson.dump() into them
+    with flash_stats.open(_OVERLAY_TMP, "w") as f:
+        f.write(ujson.dumps(overlay))
+    try:
+        # littlefs replaces the old overlay atomically
+        flash_stats.rename(_OVERLAY_TMP, OVERLAY_FILE)
+    except OSError:
+        # filesystems that won't rename over a file, _recover() completes this after a reset
+        try:
+            flash_stats.remove(OVERLAY_FILE)
+        except OSError:
+            pass
+        flash_stats.rename(_OVERLAY_TMP, OVERLAY_FILE)
+
+
+def update(settings):
+    """
+    Set every setting in the dict or none of them. Returns True once they
+    are persisted, applied to config and the subscribers notified, False
+    when one is invalid or the save failed.
+    """
+    invalid = [f"{name} = {repr(value)}" for name, value in settings.items() if not check_setting(name, value)]
+    if invalid:
+        logging.error(f"! refusing invalid config setting(s): {', '.join(invalid)}")
+        return False
+
+    changes = {}
+    for name, value in settings.items():
+        if not hasattr(config, name) or getattr(config, name) != value:
+            changes[name] = value
+    if not changes:
+        return True
+
+    overlay = dict(_overlay)
+    overlay.update(changes)
+    try:
+        _save(overlay)
+    except Exception as e:
+        logging.error(f"! failed to save config changes {list(changes)}: {e}")
+        return False
+
+    _overlay.update(changes)
+    for name, value in changes.items():
+        setattr(config, name, value)
+    logging.info(f"> config updated: {', '.join(changes)}")
+
+    for names, callback in _subscribers:
+        if any(name in changes for name in names):
+            try:
+                callback(changes)
+            except Exception as e:
+                logging.error(f"! config subscriber failed: {e}")
+    return True
+
+
+def set(name, value):
+    return update({name: value})
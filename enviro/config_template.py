@@ -16,6 +16,19 @@ wifi_country = "GB"
 # how often to wake up and take a reading (in minutes)
 reading_frequency = 15
 
+# how often to sample the temperature, humidity, pressure and light sensors
+# between readings (in seconds, 0 samples only at reading time)
+sensor_sample_interval = 30
+# how the samples are combined at reading time: "median" or "trimmed_mean"
+sensor_sample_filter = "median"
+# BME280 oversampling (1, 2, 4, 8 or 16) and IIR filter (0 = off, 2, 4, 8 or 16)
+# applied to each forced-mode measurement, higher values trade power for less noise.
+# the IIR filter keeps its state from one measurement to the next, so a non-zero
+# value lags changes by about N readings (and the fast samples between them), it
+# is not an average of N samples taken within one reading
+bme280_oversampling = 1
+bme280_iir_filter = 0
+
 # how often to trigger a resync of the onboard RTC (in hours)
 resync_frequency = 168
 
@@ -45,4 +58,40 @@ hass_discovery_triggered = False
 wind_direction_offset = 0
 
 # devices i2c connecteds on qw/st ports
-i2c_devices_cached = [35, 81, 119]
\ No newline at end of file
+i2c_devices_cached = [35, 81, 119]
+
+# SCD41 CO2 module measurement mode: "periodic" (every 5s), "low_power" (every 30s)
+# or "single_shot" (idle between readings, each reading waits 5s for a measurement).
+# the periodic modes report their newest sample, up to 5s (30s in low_power) old, and
+# the first reading after boot waits for the first sample: up to 30s in low_power
+scd41_mode = "periodic"
+
+# LTR390 UV module gain (1, 3, 6, 9 or 18) and resolution in bits (13, 16, 17, 18, 19 or 20),
+# with automatic gain ranging the gain is stepped down in bright light and up in the dark.
+# a reading waits for both channels, up to about 2.75s at 20 bits
+ltr390_gain = 9
+ltr390_resolution = 18
+ltr390_auto_gain = True
+
+# derived metrics included in full payloads (mqtt, cached uploads, local readings), any of
+# "dewpoint", "heat_index", "wind_chill", "sea_level_pressure", "absolute_humidity", "pollen_index"
+derived_metrics = ["dewpoint", "pollen_index"]
+# station altitude in metres, needed for sea_level_pressure
+altitude = None
+
+# local readings archive (used when no destination is set): one csv per "hour", "day"
+# or "month", rows written every archive_flush_every readings and a new part file
+# started once a file reaches archive_max_bytes
+archive_period = "day"
+archive_flush_every = 4
+archive_max_bytes = 262144
+
+# keep every reading in a time indexed on-device archive (archive.db, needs the
+# btree module) for range queries, readings older than reading_archive_days are dropped
+reading_archive = False
+reading_archive_days = 30
+
+# write a timeline of the boot (module imports and init steps, with time and heap used)
+# to boot_profile.txt, and publish it with the first reading after boot
+boot_profile = False
+boot_profile_publish = False
\ No newline at end of file
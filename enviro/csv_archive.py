@@ -0,0 +1,103 @@
+import enviro.helpers as helpers
+from phew import logging
+import flash_stats
+
+# ================================================================
+# 🗄️ CSV readings archive
+# ================================================================
+# one file per period, e.g. readings/2024-05-01.csv for "day". rows are
+# buffered in RAM and appended in one write every flush_every readings (and
+# when the period or the archive settings change, or before a reset). the
+# columns are every field the reading schema holds, a field without a value
+# is an empty cell. a file that grows past max_bytes, or whose columns no
+# longer match the schema, continues in the next part: 2024-05-01.1.csv
+
+ARCHIVE_DIR = "readings"
+
+# period -> length of the datetime_string() prefix naming the file
+PERIODS = {"hour": 13, "day": 10, "month": 7}
+
+
+class CsvArchive:
+    def __init__(self, directory=ARCHIVE_DIR, period="day", flush_every=4, max_bytes=256 * 1024):
+        if period not in PERIODS:
+            logging.warn(f"  - unknown archive period '{period}', using day")
+            period = "day"
+        self.directory = directory
+        self.flush_every = max(1, flush_every)
+        self.max_bytes = max_bytes
+        self._prefix_len = PERIODS[period]
+        helpers.mkdir_safe(directory)
+
+        # file currently appended to
+        self._key = None
+        self._part = 0
+        self._path = None
+        self._size = 0
+        self._fields = None
+        self._header = None
+        self._rows = []
+
+    def _part_path(self, key, part):
+        if part == 0:
+            return f"{self.directory}/{key}.csv"
+        return f"{self.directory}/{key}.{part}.csv"
+
+    def _open(self, key, fields):
+        """Pick up the newest part of the period, or start a new one if it can't take these rows."""
+        part = 0
+        while helpers.file_exists(self._part_path(key, part + 1)):
+            part += 1
+
+        header = "timestamp," + ",".join(fields) + "\r\n"
+        path = self._part_path(key, part)
+        size = helpers.file_size(path) or 0
+        if size:
+            with open(path, "r") as f:
+                first_line = f.readline()
+            if first_line.rstrip("\r\n") != header.rstrip("\r\n") or size >= self.max_bytes:
+                part += 1
+                path = self._part_path(key, part)
+                size = 0
+
+        self._key = key
+        self._part = part
+        self._path = path
+        self._size = size
+        self._fields = fields
+        self._header = header
+
+    def append(self, timestamp, readings):
+        """Buffer one row, timestamp is a datetime_string()."""
+        key = timestamp[: self._prefix_len]
+        fields = readings.columns()
+        if key != self._key or fields != self._fields:
+            self.flush()
+            self._open(key, fields)
+
+        cells = []
+        for name in fields:
+            value = readings.get(name)
+            cells.append("" if value is None else str(value))
+        self._rows.append(timestamp + "," + ",".join(cells) + "\r\n")
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+
+        data = "".join(self._rows)
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._part += 1
+            self._path = self._part_path(self._key, self._part)
+            self._size = 0
+
+        with flash_stats.open(self._path, "a") as f:
+            if self._size == 0:
+                f.write(self._header)
+                self._size = len(self._header)
+            f.write(data)
+        self._size += len(data)
+        logging.debug(f"  - archived {len(self._rows)} reading(s) to {self._path}")
+        self._rows = []
@@ -0,0 +1,101 @@
+from ucollections import OrderedDict
+from enviro import config
+import enviro.helpers as helpers
+
+# ================================================================
+# 🧮 Derived metrics
+# ================================================================
+# metrics computed from other readings, declared with their dependencies.
+# nothing is computed until a sink asks for the field, and each value is
+# computed at most once per reading. a metric returning None is unavailable.
+
+# name: (dependency names, function taking the dependency values)
+METRICS = OrderedDict()
+
+
+def register(name, dependencies, function):
+    """Declare a derived metric, boards use this for their own metrics."""
+    METRICS[name] = (dependencies, function)
+
+
+def _sea_level_pressure(pressure, temperature):
+    altitude = getattr(config, "altitude", None)
+    if altitude is None:
+        return None
+    return round(helpers.get_sea_level_pressure(pressure, temperature, altitude), 2)
+
+
+register("dewpoint", ("temperature", "humidity"), lambda t, rh: round(helpers.calculate_dewpoint(t, rh), 2))
+register("heat_index", ("temperature", "humidity"), lambda t, rh: round(helpers.calculate_heat_index(t, rh), 2))
+register("wind_chill", ("temperature", "wind_speed"), lambda t, v: round(helpers.calculate_wind_chill(t, v), 2))
+register("sea_level_pressure", ("pressure", "temperature"), _sea_level_pressure)
+# g/m³
+register(
+    "absolute_humidity",
+    ("temperature", "humidity"),
+    lambda t, rh: round(helpers.relative_to_absolute_humidity(rh, t) * 1000, 2),
+)
+
+
+class Readings:
+    """
+    Measured readings plus derived metrics computed on first access.
+
+    Any derived metric can be looked up by name; iterating (and to_dict())
+    only includes the published ones, config.derived_metrics by default,
+    so full payloads don't pay for metrics nobody uses.
+    """
+
+    def __init__(self, base, published=None):
+        self.base = base
+        self.published = config.derived_metrics if published is None else published
+        self._cache = {}
+
+    def _derive(self, name):
+        if name in self._cache:
+            return self._cache[name]
+        dependencies, function = METRICS[name]
+        value = None
+        if all(dependency in self for dependency in dependencies):
+            value = function(*[self[dependency] for dependency in dependencies])
+        self._cache[name] = value
+        return value
+
+    def __getitem__(self, name):
+        if name in self.base:
+            return self.base[name]
+        if name in METRICS:
+            value = self._derive(name)
+            if value is not None:
+                return value
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        if name in self.base:
+            return True
+        return name in METRICS and self._derive(name) is not None
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def keys(self):
+        for name in self.base:
+            yield name
+        for name in self.published:
+            if name not in self.base and name in METRICS and self._derive(name) is not None:
+                yield name
+
+    def __iter__(self):
+        return self.keys()
+
+    def columns(self):
+        """Every field a reading can hold, set or not: the schema then the published metrics."""
+        names = self.base.schema.names
+        return names + tuple(name for name in self.published if name in METRICS and name not in names)
+
+    def items(self):
+        for name in self.keys():
+            yield name, self[name]
+
+    def to_dict(self):
+        return OrderedDict(self.items())
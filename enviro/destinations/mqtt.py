@@ -146,6 +146,24 @@ def hass_discovery(board_type="weather"):
         mqtt_client,
         "mdi:weather-windy-variant",
     )
+    mqtt_discovery(
+        "Wind Speed 10 Min",
+        "wind_speed",
+        "m/s",
+        "readings.wind_speed_10m",
+        board_type,
+        mqtt_client,
+        "mdi:weather-windy",
+    )
+    mqtt_discovery(
+        "Wind Gust Today",
+        "wind_speed",
+        "m/s",
+        "readings.wind_gust_today",
+        board_type,
+        mqtt_client,
+        "mdi:weather-windy-variant",
+    )
     mqtt_discovery(
         "Wind Direction",
         "none",
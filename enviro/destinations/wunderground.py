@@ -2,6 +2,7 @@ from enviro import logging
 from enviro.constants import UPLOAD_SUCCESS, UPLOAD_FAILED
 import urequests
 import config
+from enviro.derived import Readings
 from enviro.helpers import (
     celcius_to_fahrenheit,
     hpa_to_inches,
@@ -35,7 +36,8 @@ def upload_reading(reading):
         f"ID={config.wunderground_id}&PASSWORD={config.wunderground_key}"
         f"&dateutc={timestamp}&softwaretype=EnviroWeather&action=updateraw"
     )
-    readings = reading["readings"]
+    # cached payloads only hold the published derived metrics, derive the rest here
+    readings = Readings(reading["readings"])
 
     # Temperature (°C → °F)
     if "temperature" in readings:
@@ -74,6 +76,14 @@ def upload_reading(reading):
     if "wind_speed" in readings:
         url += "&windspeedmph=" + str(metres_per_second_to_miles_per_hour(readings["wind_speed"]))
 
+    # Wind speed 2 min average (m/s → mph)
+    if "wind_speed" in readings:
+        url += "&windspdmph_avg2m=" + str(metres_per_second_to_miles_per_hour(readings["wind_speed"]))
+
+    # Wind speed 10 min average (m/s → mph)
+    if "wind_speed_10m" in readings:
+        url += "&windspdmph_avg10m=" + str(metres_per_second_to_miles_per_hour(readings["wind_speed_10m"]))
+
     # Wind gust (m/s → mph)
     if "wind_gust" in readings:
         url += "&windgustmph=" + str(metres_per_second_to_miles_per_hour(readings["wind_gust"]))
@@ -0,0 +1,116 @@
+import time
+from machine import Timer
+from phew import logging
+
+# ================================================================
+# 🔋 Energy accounting (INA219 coulomb counting)
+# ================================================================
+# current and power are sampled on a soft timer at a fixed cadence and
+# integrated per cycle, per day and per phase of the cycle. enviro marks the
+# phases with set_phase() as it goes and closes the cycle with close_cycle()
+# when it goes to sleep, after the upload. a reading is taken before its own
+# cycle is over, so the cycle fields it carries are the last complete cycle:
+# sleep, ntp / ota / discovery, sampling, wifi and upload.
+
+SAMPLE_MS = 100
+# conversions averaged by the INA219 for each register update
+AVERAGING = 64
+
+IDLE = "idle"
+PHASES = (IDLE, "sampling", "wifi", "upload")
+
+# reading fields written by report(), as (name, decimals)
+FIELDS = (
+    ("energy_last_cycle_mah", 3),
+    ("energy_last_cycle_mwh", 3),
+    ("energy_today_mah", 2),
+    ("energy_today_mwh", 2),
+) + tuple((f"energy_last_{phase}_mwh", 3) for phase in PHASES if phase != IDLE)
+
+# the meter started by the INA219 module, None when no INA219 is connected
+meter = None
+
+
+def set_phase(phase):
+    """Attribute the energy used from now on to phase, a no-op without an INA219."""
+    if meter is not None:
+        meter.phase = phase
+
+
+def close_cycle():
+    """End the cycle in progress, a no-op without an INA219."""
+    if meter is not None:
+        meter.close_cycle()
+
+
+class EnergyMeter:
+    def __init__(self, ina, period_ms=SAMPLE_MS):
+        self.ina = ina
+        self.period_ms = period_ms
+        self.phase = IDLE
+        self.errors = 0
+        # per phase [mA·s, mW·s] of the cycle in progress
+        self.cycle = {phase: [0.0, 0.0] for phase in PHASES}
+        # the same for the last complete cycle, None until one was closed
+        self.last = None
+        self.day = time.localtime()[:3]
+        self.day_mas = 0.0
+        self.day_mws = 0.0
+        self._last_ms = None
+        self._timer = Timer(-1)
+
+    def start(self):
+        self._last_ms = time.ticks_ms()
+        self._timer.init(period=self.period_ms, mode=Timer.PERIODIC, callback=self._sample)
+
+    def stop(self):
+        self._timer.deinit()
+
+    def _sample(self, timer):
+        now = time.ticks_ms()
+        seconds = time.ticks_diff(now, self._last_ms) / 1000.0
+        self._last_ms = now
+        try:
+            current = self.ina.current
+            power = self.ina.power * 1000.0
+        except OSError:
+            self.errors += 1
+            return
+
+        charge = current * seconds
+        energy = power * seconds
+        acc = self.cycle.get(self.phase) or self.cycle[IDLE]
+        acc[0] += charge
+        acc[1] += energy
+        self.day_mas += charge
+        self.day_mws += energy
+
+    def close_cycle(self):
+        """Keep the cycle in progress as the last complete one and start a new one."""
+        self.last, self.cycle = self.cycle, {phase: [0.0, 0.0] for phase in PHASES}
+        if self.errors:
+            logging.warn(f"  - {self.errors} failed INA219 sample(s) this cycle")
+            self.errors = 0
+
+    def report(self, reading):
+        """
+        Write today's totals and the last complete cycle into reading, the
+        cycle fields are left out until the first cycle since boot is closed.
+        Daily totals restart when the date changes.
+        """
+        today = time.localtime()[:3]
+        if today != self.day:
+            self.day = today
+            self.day_mas = 0.0
+            self.day_mws = 0.0
+
+        reading["energy_today_mah"] = self.day_mas / 3600.0
+        reading["energy_today_mwh"] = self.day_mws / 3600.0
+        if self.last is None:
+            return
+
+        reading["energy_last_cycle_mah"] = sum(acc[0] for acc in self.last.values()) / 3600.0
+        reading["energy_last_cycle_mwh"] = sum(acc[1] for acc in self.last.values()) / 3600.0
+        for phase in PHASES:
+            if phase != IDLE:
+                reading[f"energy_last_{phase}_mwh"] = self.last[phase][1] / 3600.0
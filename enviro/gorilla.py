@@ -0,0 +1,214 @@
+import struct
+
+# ================================================================
+# 🦍 Gorilla time-series codec
+# ================================================================
+# compresses a run of readings taken with the same layout into one block:
+# timestamps as delta-of-delta, each field as the XOR of its float32 bits
+# with the previous value, everything bit-packed into a bytearray. evenly
+# spaced timestamps cost 1 bit and an unchanged field 1 bit, a slowly
+# moving value typically 15 to 20 bits instead of 32.
+#
+# block: count, field count, first epoch, then the bit stream
+#   first values:  32 bits each
+#   timestamp:     '0' same delta | '10' 7 bits | '110' 9 bits | '1110' 12 bits | '1111' 32 bits
+#   value:         '0' same bits | '10' meaningful bits in the previous window
+#                  | '11' 5 bits leading zeros, 5 bits length - 1, meaningful bits
+#
+# values are passed around as their uint32 bit patterns so NaN (unset)
+# round-trips exactly. no enviro imports, tools/decode_archive.py uses this
+# module on the host as well.
+
+_HEADER = "<HBI"
+HEADER_SIZE = struct.calcsize(_HEADER)
+
+# (prefix, prefix bits, value bits) for the delta-of-delta buckets
+_DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+
+
+def _leading_zeros(x):
+    n = 0
+    if not x & 0xFFFF0000:
+        n += 16
+        x <<= 16
+    if not x & 0xFF000000:
+        n += 8
+        x <<= 8
+    if not x & 0xF0000000:
+        n += 4
+        x <<= 4
+    if not x & 0xC0000000:
+        n += 2
+        x <<= 2
+    if not x & 0x80000000:
+        n += 1
+    return n
+
+
+def _trailing_zeros(x):
+    n = 0
+    while not x & 1:
+        n += 1
+        x >>= 1
+    return n
+
+
+class BitWriter:
+    def __init__(self):
+        self.buf = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value, bits):
+        self._acc = (self._acc << bits) | (value & ((1 << bits) - 1))
+        self._bits += bits
+        while self._bits >= 8:
+            self._bits -= 8
+            self.buf.append((self._acc >> self._bits) & 0xFF)
+        self._acc &= (1 << self._bits) - 1
+
+    def getvalue(self):
+        if self._bits:
+            return bytes(self.buf) + bytes([(self._acc << (8 - self._bits)) & 0xFF])
+        return bytes(self.buf)
+
+
+class BitReader:
+    def __init__(self, data, offset=0):
+        self.data = data
+        self.pos = offset * 8
+
+    def read(self, bits):
+        value = 0
+        pos = self.pos
+        data = self.data
+        while bits:
+            used = pos & 7
+            take = min(8 - used, bits)
+            value = (value << take) | ((data[pos >> 3] >> (8 - used - take)) & ((1 << take) - 1))
+            pos += take
+            bits -= take
+        self.pos = pos
+        return value
+
+    def read_signed(self, bits):
+        value = self.read(bits)
+        if value >= 1 << (bits - 1):
+            value -= 1 << bits
+        return value
+
+
+class Encoder:
+    """Builds one block, append() readings in time order then getvalue()."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.count = 0
+        self.first_ts = 0
+        self._bits = BitWriter()
+        self._ts = 0
+        self._delta = 0
+        self._prev = [0] * fields
+        # meaningful bits window of the last value written in full, per field
+        self._leading = [0] * fields
+        self._trailing = [0] * fields
+        self._window = [False] * fields
+
+    def append(self, ts, values):
+        """values: the uint32 bit patterns of the reading's float32 fields."""
+        w = self._bits
+        if self.count == 0:
+            self.first_ts = ts
+            for i in range(self.fields):
+                w.write(values[i], 32)
+                self._prev[i] = values[i]
+        else:
+            delta = ts - self._ts
+            dod = delta - self._delta
+            self._delta = delta
+            if dod == 0:
+                w.write(0, 1)
+            else:
+                for prefix, prefix_bits, bits in _DOD_BUCKETS:
+                    if -(1 << (bits - 1)) <= dod < 1 << (bits - 1):
+                        w.write(prefix, prefix_bits)
+                        w.write(dod, bits)
+                        break
+                else:
+                    w.write(0b1111, 4)
+                    w.write(dod, 32)
+
+            for i in range(self.fields):
+                self._write_value(i, values[i])
+        self._ts = ts
+        self.count += 1
+
+    def _write_value(self, i, value):
+        w = self._bits
+        xor = value ^ self._prev[i]
+        self._prev[i] = value
+        if xor == 0:
+            w.write(0, 1)
+            return
+
+        leading = min(_leading_zeros(xor), 31)
+        trailing = _trailing_zeros(xor)
+        if self._window[i] and leading >= self._leading[i] and trailing >= self._trailing[i]:
+            w.write(0b10, 2)
+            w.write(xor >> self._trailing[i], 32 - self._leading[i] - self._trailing[i])
+            return
+
+        length = 32 - leading - trailing
+        w.write(0b11, 2)
+        w.write(leading, 5)
+        w.write(length - 1, 5)
+        w.write(xor >> trailing, length)
+        self._leading[i] = leading
+        self._trailing[i] = trailing
+        self._window[i] = True
+
+    def getvalue(self):
+        return struct.pack(_HEADER, self.count, self.fields, self.first_ts) + self._bits.getvalue()
+
+
+def block_info(block, offset=0):
+    """Return (count, fields, first epoch) without decoding the block."""
+    return struct.unpack_from(_HEADER, block, offset)
+
+
+def decode(block, offset=0):
+    """
+    Yield (epoch, values) for each reading of the block at offset, values is
+    a list of uint32 bit patterns reused between items.
+    """
+    count, fields, ts = block_info(block, offset)
+    if not count:
+        return
+    r = BitReader(block, offset + HEADER_SIZE)
+    values = [r.read(32) for _ in range(fields)]
+    leading = [0] * fields
+    trailing = [0] * fields
+    yield ts, values
+
+    delta = 0
+    for _ in range(count - 1):
+        if r.read(1):
+            if not r.read(1):
+                dod = r.read_signed(7)
+            elif not r.read(1):
+                dod = r.read_signed(9)
+            elif not r.read(1):
+                dod = r.read_signed(12)
+            else:
+                dod = r.read_signed(32)
+            delta += dod
+        ts += delta
+
+        for i in range(fields):
+            if not r.read(1):
+                continue
+            if r.read(1):
+                leading[i] = r.read(5)
+                trailing[i] = 32 - leading[i] - (r.read(5) + 1)
+            values[i] ^= r.read(32 - leading[i] - trailing[i]) << trailing[i]
+        yield ts, values
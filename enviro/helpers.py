@@ -1,6 +1,8 @@
 from enviro.constants import *
 import machine, math, os, time, utime
 from phew import logging
+import flash_stats
+import enviro.config_store as config_store
 import config
 try:
     import uerrno as errno
@@ -81,7 +83,7 @@ def uk_bst():
 
 
 def update_config(var_name, new_value):
-    """Update a variable in config.py while keeping comments and order."""
+    """Update a setting, strings such as "true" or "12" are converted. See config_store."""
     try:
         if isinstance(new_value, str):
             lower = new_value.strip().lower()
@@ -102,55 +104,7 @@ def update_config(var_name, new_value):
                     # mantém como string literal
                     pass
 
-        # Update the value in memory
-        setattr(config, var_name, new_value)
-
-        # Format value for Python syntax
-        if isinstance(new_value, str):
-            new_value_str = f"'{new_value}'"
-        elif new_value is None:
-            new_value_str = "None"
-        else:
-            new_value_str = str(new_value)
-
-        # Read original config file
-        with open("config.py", "r") as f:
-            lines = f.readlines()
-
-        updated = False
-        new_lines = []
-
-        for line in lines:
-            stripped = line.lstrip()
-            if stripped.startswith(var_name + " ="):
-                # Keep inline comment (after '#') if present
-                parts = line.split("#", 1)
-                comment = ""
-                if len(parts) > 1:
-                    comment = "#" + parts[1].rstrip("\n")
-
-                # Build updated line preserving comment
-                new_line = f"{var_name} = {new_value_str}"
-                if comment:
-                    new_line += " " + comment
-                new_line += "\n"
-
-                new_lines.append(new_line)
-                updated = True
-            else:
-                new_lines.append(line)
-
-        # If variable not found, append it at the end
-        if not updated:
-            new_lines.append(f"\n{var_name} = {new_value_str}\n")
-
-        # Write lines back to file (MicroPython-safe)
-        with open("config.py", "w") as f:
-            for line in new_lines:
-                f.write(line)
-
-        logging.info(f"variable '{var_name}' updated to {new_value_str}")
-        return True
+        return config_store.set(var_name, new_value)
     except Exception as e:
         logging.warn(f"error when updating variable '{var_name}'")
         return False
@@ -199,7 +153,7 @@ def mkdir_safe(path):
 
 def copy_file(source, target):
     with open(source, "rb") as infile:
-        with open(target, "wb") as outfile:
+        with flash_stats.open(target, "wb") as outfile:
             while True:
                 chunk = infile.read(1024)
                 if not chunk:
@@ -207,6 +161,37 @@ def copy_file(source, target):
                 outfile.write(chunk)
 
 
+def _crc32_table():
+    table = []
+    for i in range(256):
+        c = i
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+
+_crc_table = None
+
+
+def crc32(data):
+    """CRC-32 (same as zlib), using binascii.crc32 when the firmware provides it."""
+    global _crc_table
+    try:
+        import binascii
+
+        return binascii.crc32(data) & 0xFFFFFFFF
+    except (ImportError, AttributeError):
+        pass
+
+    if _crc_table is None:
+        _crc_table = _crc32_table()
+    crc = 0xFFFFFFFF
+    for b in data:
+        crc = _crc_table[(crc ^ b) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
 # temperature and humidity helpers
 # ===========================================================================
 
@@ -242,6 +227,36 @@ def calculate_dewpoint(temperature_in_c, relative_humidity):
     return dewpoint_in_c
 
 
+# NWS heat index (Rothfusz regression), only meaningful above ~27°C
+# https://www.wpc.ncep.noaa.gov/html/heatindex_equation.shtml
+def calculate_heat_index(temperature_in_c, relative_humidity):
+    t = celcius_to_fahrenheit(temperature_in_c)
+    rh = relative_humidity
+    hi = 0.5 * (t + 61.0 + ((t - 68.0) * 1.2) + (rh * 0.094))
+    if (hi + t) / 2 >= 80:
+        hi = (
+            -42.379
+            + 2.04901523 * t
+            + 10.14333127 * rh
+            - 0.22475541 * t * rh
+            - 0.00683783 * t * t
+            - 0.05481717 * rh * rh
+            + 0.00122874 * t * t * rh
+            + 0.00085282 * t * rh * rh
+            - 0.00000199 * t * t * rh * rh
+        )
+    return (hi - 32) / 1.8
+
+
+# Environment Canada / NWS wind chill, defined at or below 10°C and above 4.8 km/h
+def calculate_wind_chill(temperature_in_c, wind_speed_in_mps):
+    speed_in_kmh = wind_speed_in_mps * 3.6
+    if temperature_in_c > 10 or speed_in_kmh <= 4.8:
+        return temperature_in_c
+    v = speed_in_kmh**0.16
+    return 13.12 + 0.6215 * temperature_in_c - 11.37 * v + 0.3965 * temperature_in_c * v
+
+
 def celcius_to_kelvin(temperature_in_c):
     return temperature_in_c + 273.15
 
@@ -273,6 +288,42 @@ def angular_diff(a, b):
     return d
 
 
+def median(values):
+    ordered = sorted(values)
+    n = len(ordered)
+    if not n:
+        return None
+    mid = n // 2
+    if n % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2.0
+
+
+def trimmed_mean(values, trim=0.2):
+    """Mean after dropping the lowest and highest `trim` fraction of values."""
+    ordered = sorted(values)
+    n = len(ordered)
+    if not n:
+        return None
+    cut = int(n * trim)
+    if n - 2 * cut < 1:
+        cut = (n - 1) // 2
+    kept = ordered[cut : n - cut]
+    return sum(kept) / len(kept)
+
+
+def bisect_right(table, value):
+    """Index where value would be inserted in the sorted table (bisect isn't built in on the Pico)."""
+    lo, hi = 0, len(table)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if value < table[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
 def vec_to_deg(x, y):
     if x == 0 and y == 0:
         return 0.0
@@ -370,7 +421,11 @@ def check_i2c_and_flag_discovery(found_devices):
         if current_sig != cached_sig:
             logging.info(f"> I2C change detected: {cached_sig} -> {current_sig}")
             # persiste a lista (como ints) e força novo discovery
-            update_config("i2c_devices_cached", sorted(int(a) for a in found_devices))
-            update_config("hass_discovery_triggered", False)
+            config_store.update(
+                {
+                    "i2c_devices_cached": sorted(int(a) for a in found_devices),
+                    "hass_discovery_triggered": False,
+                }
+            )
     except Exception as e:
         logging.error(f"! failed to update I2C cache / discovery flag: {e}")
\ No newline at end of file
@@ -0,0 +1,237 @@
+import struct
+import enviro.helpers as helpers
+from phew import logging
+import flash_stats
+
+# ================================================================
+# 🗓️ Rolling 7-day hourly history
+# ================================================================
+# one fixed-size slot per hour, addressed by (hour // 3600) % HOURS, so the
+# file never grows and closing an hour is a single seek + small write.
+#
+# file layout:
+#   header: magic, version, field count, names length, comma separated names
+#   slots:  hour epoch, rain sum, then min / max / mean / count per field
+#
+# the fields come from the reading schema, a field with no reading in an
+# hour is stored as NaN with a count of 0.
+
+HISTORY_FILE = "history.bin"
+HOURS = 7 * 24
+MAX_FIELDS = 32
+
+_MAGIC = 0x4853
+_VERSION = 1
+_HEADER = "<HBBH"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_SLOT_HEADER = "<If"
+_SLOT_HEADER_SIZE = struct.calcsize(_SLOT_HEADER)
+_FIELD = "<fffH"
+_FIELD_SIZE = struct.calcsize(_FIELD)
+# a field with no reading in the hour
+_EMPTY_FIELD = struct.pack(_FIELD, float("nan"), float("nan"), float("nan"), 0)
+
+# the rain field is summed per hour on top of the regular aggregates
+RAIN_FIELD = "rain"
+# running daily aggregates would only repeat what the hourly min/max/mean hold
+SKIP_SUFFIXES = ("_min", "_max", "_avg", "_today")
+
+
+def history_fields(names):
+    """The reading names (all numeric) worth keeping an hourly history of."""
+    fields = []
+    for name in names:
+        if name in fields or any(name.endswith(suffix) for suffix in SKIP_SUFFIXES):
+            continue
+        fields.append(name)
+    return fields[:MAX_FIELDS]
+
+
+class HourlyHistory:
+    """
+    Hourly aggregates of the fields a reading can hold, laid out from the
+    reading schema rather than from whatever one reading happened to contain,
+    so a sensor missing a reading only leaves its count at 0 for that hour.
+    """
+
+    def __init__(self, names, path=HISTORY_FILE, hours=HOURS):
+        self.path = path
+        self.hours = hours
+        self.fields = None
+        self._data_offset = 0
+        self._slot_size = 0
+
+        # aggregates for the hour currently being collected
+        self._hour = None
+        self._acc = None
+        self._rain = 0.0
+
+        self._open_existing()
+        self.set_fields(names)
+
+    # file handling
+    # ===========================================================================
+    def _set_layout(self, fields):
+        self.fields = fields
+        names = ",".join(fields).encode()
+        self._data_offset = _HEADER_SIZE + len(names)
+        self._slot_size = _SLOT_HEADER_SIZE + len(fields) * _FIELD_SIZE
+        return names
+
+    def _open_existing(self):
+        try:
+            with open(self.path, "rb") as f:
+                magic, version, count, names_len = struct.unpack(_HEADER, f.read(_HEADER_SIZE))
+                if magic != _MAGIC or version != _VERSION:
+                    return
+                names = f.read(names_len).decode()
+            fields = names.split(",") if names else []
+            if len(fields) == count:
+                self._set_layout(fields)
+        except (OSError, ValueError):
+            pass
+
+    def set_fields(self, names):
+        """
+        Lay the history out for these reading names. The file is only rewritten
+        when the fields change, keeping the stored hours and the open hour of
+        the fields both layouts share.
+        """
+        fields = history_fields(names)
+        if fields == self.fields:
+            return
+        if self.fields is None or not helpers.file_exists(self.path):
+            self._create(fields)
+            self._acc = None
+            return
+
+        logging.info("> history fields changed, converting hourly history")
+        old_index = {name: i for i, name in enumerate(self.fields)}
+        self._convert(fields, old_index)
+        if self._acc is not None:
+            self._acc = [
+                self._acc[old_index[name]] if name in old_index else [None, None, 0.0, 0] for name in fields
+            ]
+
+    def _convert(self, fields, old_index):
+        """Copy every slot into a file laid out for fields, then replace the old one."""
+        old_offset = self._data_offset
+        old_size = self._slot_size
+        names = self._set_layout(fields)
+        tmp = self.path + ".tmp"
+        with open(self.path, "rb") as src:
+            with flash_stats.open(tmp, "wb") as dst:
+                dst.write(struct.pack(_HEADER, _MAGIC, _VERSION, len(fields), len(names)))
+                dst.write(names)
+                for slot in range(self.hours):
+                    src.seek(old_offset + slot * old_size)
+                    raw = src.read(old_size)
+                    if len(raw) != old_size:
+                        dst.write(bytes(self._slot_size))
+                        continue
+                    parts = [raw[:_SLOT_HEADER_SIZE]]
+                    for name in fields:
+                        i = old_index.get(name)
+                        if i is None:
+                            parts.append(_EMPTY_FIELD)
+                        else:
+                            offset = _SLOT_HEADER_SIZE + i * _FIELD_SIZE
+                            parts.append(raw[offset : offset + _FIELD_SIZE])
+                    dst.write(b"".join(parts))
+        try:
+            flash_stats.rename(tmp, self.path)
+        except OSError:
+            flash_stats.remove(self.path)
+            flash_stats.rename(tmp, self.path)
+
+    def _create(self, fields):
+        """Preallocate the whole ring so later writes never grow the file."""
+        names = self._set_layout(fields)
+        empty_slot = bytes(self._slot_size)
+        with flash_stats.open(self.path, "wb") as f:
+            f.write(struct.pack(_HEADER, _MAGIC, _VERSION, len(fields), len(names)))
+            f.write(names)
+            for _ in range(self.hours):
+                f.write(empty_slot)
+        logging.debug(f"> history created for {len(fields)} field(s)")
+
+    def _slot_offset(self, hour):
+        return self._data_offset + ((hour // 3600) % self.hours) * self._slot_size
+
+    # collecting
+    # ===========================================================================
+    def record(self, readings, ts):
+        """Fold one reading (taken at epoch ts) into the current hour."""
+        hour = ts - ts % 3600
+        if self._hour is not None and hour != self._hour:
+            self.flush()
+
+        if self._acc is None:
+            self._hour = hour
+            self._acc = [[None, None, 0.0, 0] for _ in self.fields]
+            self._rain = 0.0
+
+        for i, name in enumerate(self.fields):
+            # a field missing from this reading just isn't counted
+            if name not in readings:
+                continue
+            value = readings[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            acc = self._acc[i]
+            if acc[0] is None or value < acc[0]:
+                acc[0] = value
+            if acc[1] is None or value > acc[1]:
+                acc[1] = value
+            acc[2] += value
+            acc[3] += 1
+            if name == RAIN_FIELD:
+                self._rain += value
+
+    def flush(self):
+        """Write the hour collected so far into its slot."""
+        if self._acc is None or self.fields is None:
+            return
+
+        parts = [struct.pack(_SLOT_HEADER, self._hour, self._rain)]
+        for vmin, vmax, total, count in self._acc:
+            if count:
+                parts.append(struct.pack(_FIELD, vmin, vmax, total / count, count))
+            else:
+                parts.append(_EMPTY_FIELD)
+
+        with flash_stats.open(self.path, "r+b") as f:
+            f.seek(self._slot_offset(self._hour))
+            f.write(b"".join(parts))
+
+        self._hour = None
+        self._acc = None
+        self._rain = 0.0
+
+    # querying
+    # ===========================================================================
+    def query(self, start_ts, end_ts):
+        """
+        Yield (hour_ts, rain_sum, {field: (min, max, mean, count)}) for every
+        stored hour overlapping start_ts..end_ts, oldest first.
+        """
+        if self.fields is None or not helpers.file_exists(self.path):
+            return
+
+        oldest = end_ts - self.hours * 3600
+        hour = max(start_ts - start_ts % 3600, oldest - oldest % 3600)
+        with open(self.path, "rb") as f:
+            while hour < end_ts:
+                f.seek(self._slot_offset(hour))
+                raw = f.read(self._slot_size)
+                stored_hour, rain = struct.unpack(_SLOT_HEADER, raw[:_SLOT_HEADER_SIZE])
+                if stored_hour == hour:
+                    values = {}
+                    offset = _SLOT_HEADER_SIZE
+                    for name in self.fields:
+                        vmin, vmax, mean, count = struct.unpack(_FIELD, raw[offset : offset + _FIELD_SIZE])
+                        if count:
+                            values[name] = (vmin, vmax, mean, count)
+                        offset += _FIELD_SIZE
+                    yield hour, rain, values
+                hour += 3600
@@ -1,23 +1,31 @@
 from breakout_bme68x import BreakoutBME68X
-from ucollections import OrderedDict
 from phew import logging
 
+FIELDS = (
+    ("temperature_bme688", 2),
+    ("humidity_bme688", 2),
+    ("pressure_bme688", 2),
+    ("gas_resistance_bme688", 2),
+)
 
-def get_readings(i2c, address, seconds_since_last):
-    bme688 = BreakoutBME68X(i2c)
+
+def init(i2c, address):
+    return BreakoutBME68X(i2c, address)
+
+
+def start(bme688):
+    return bme688
+
+
+def poll(bme688, reading):
     bme688_data = bme688.read()
 
-    readings = OrderedDict(
-        {
-            "temperature_bme688": round(bme688_data[0], 2),
-            "humidity_bme688": round(bme688_data[2], 2),
-            "pressure_bme688": round(bme688_data[1] / 100.0, 2),
-            "gas_resistance_bme688": round(bme688_data[3], 2),
-        }
-    )
+    reading["temperature_bme688"] = bme688_data[0]
+    reading["humidity_bme688"] = bme688_data[2]
+    reading["pressure_bme688"] = bme688_data[1] / 100.0
+    reading["gas_resistance_bme688"] = bme688_data[3]
 
-    for reading in readings:
-        name_and_value = reading + " : " + str(readings[reading])
-        logging.debug(f"  - {name_and_value}")
+    for name, _ in FIELDS:
+        logging.debug(f"  - {name} : {reading[name]}")
 
-    return readings
+    return True
@@ -1,18 +1,39 @@
 from lib import adafruit_ina219
-from ucollections import OrderedDict
 from phew import logging
 from enviro.constants import I2C_ADDR_INA219
 from enviro.helpers import get_battery_percent
+import enviro.energy as energy
 
-def get_readings(i2c, address=I2C_ADDR_INA219):
+FIELDS = (("battery_voltage", 3), ("battery_percent", 0)) + energy.FIELDS
+
+def init(i2c, address=I2C_ADDR_INA219):
     ina = adafruit_ina219.INA219(i2c, address)
-    logging.debug(f"  - INA219 initialized")
+    # 40uA resolution up to 1.3A covers the pico w from sleep to wifi peaks
+    ina.set_calibration_32V_1A()
+    ina.set_averaging(energy.AVERAGING)
+
+    if energy.meter is None:
+        energy.meter = energy.EnergyMeter(ina)
+    else:
+        # driver re-created after an i2c error
+        energy.meter.ina = ina
+    energy.meter.start()
+    return ina
+
+
+def start(ina):
+    return ina
+
+
+def poll(ina, reading):
+    # runs in continuous conversion mode, the latest value is always available
     volts = ina.bus_voltage
-    readings = OrderedDict(
-        {
-            "battery_voltage": volts,
-            "battery_percent": get_battery_percent(volts)
-        }
-    )
-    logging.debug(f"  - battery voltage: {readings['battery_voltage']}, percent: {readings['battery_percent']}")
-    return readings
+    percent = get_battery_percent(volts)
+    reading["battery_voltage"] = volts
+    reading["battery_percent"] = percent
+    logging.debug(f"  - battery voltage: {volts}, percent: {percent}")
+
+    energy.meter.report(reading)
+    if "energy_last_cycle_mah" in reading:
+        logging.debug(f"  - energy last cycle: {reading['energy_last_cycle_mah']}mAh, {reading['energy_last_cycle_mwh']}mWh")
+    return True
@@ -1,20 +1,44 @@
 from lib import adafruit_ltr390
-from ucollections import OrderedDict
+from enviro import config
 from phew import logging
 
+FIELDS = (("uv_raw", 0), ("als_raw", 0), ("uv_index", 2), ("luminance_ltr390", 2))
 
-def get_readings(i2c, address):
-    uv_sensor = adafruit_ltr390.LTR390(i2c)
-    logging.debug(f"  - LTR390 initialized")
-    uv = uv_sensor.read_uvs()
-    readings = OrderedDict(
-        {
-            "uv_raw": uv,
-            "als_raw": uv_sensor.read_als(),
-            "uv_index": uv / 2300.0,
-        }
-    )
-    logging.debug(
-        f"  - uv readings - uv: {readings['uv_raw']}, als: {readings['als_raw']}, uv index: {readings['uv_index']}"
-    )
-    return readings
+# set by init() from the configured resolution, 20 bits converts every 500ms
+ACQUIRE_TIMEOUT_MS = 1000
+
+
+def init(i2c, address):
+    global ACQUIRE_TIMEOUT_MS
+    uv_sensor = adafruit_ltr390.LTR390(i2c, address)
+    try:
+        uv_sensor.configure(config.ltr390_gain, config.ltr390_resolution, config.ltr390_auto_gain)
+    except ValueError as e:
+        logging.warn(f"  - {e}, using default LTR390 settings")
+        uv_sensor.configure()
+    # measures continuously from here on, alternating between als and uv
+    uv_sensor.start_continuous()
+    # a reading starts anywhere in the cycle: the running conversion, one per
+    # channel and an auto gain re-measure of each
+    ACQUIRE_TIMEOUT_MS = max(1000, 5 * uv_sensor.interval_ms + 250)
+    return uv_sensor
+
+
+def start(uv_sensor):
+    # both channels have to be refreshed during this reading
+    return {"sensor": uv_sensor, "updated": 0}
+
+
+def poll(state, reading):
+    uv_sensor = state["sensor"]
+    if uv_sensor.update():
+        state["updated"] += 1
+    if state["updated"] < 2:
+        return None
+
+    reading["uv_raw"] = uv_sensor.uvs
+    reading["als_raw"] = uv_sensor.als
+    reading["uv_index"] = uv_sensor.uvi
+    reading["luminance_ltr390"] = uv_sensor.lux
+    logging.debug(f"  - uv readings - uv: {uv_sensor.uvs}, als: {uv_sensor.als}, uv index: {uv_sensor.uvi}")
+    return True
@@ -1,24 +1,63 @@
 import time
-
-import breakout_scd41
-
-
-def get_readings(i2c, address, seconds_since_last):
-    breakout_scd41.init(i2c)
-    breakout_scd41.start()
-
-    retries = 25
-    while retries > 0 and not breakout_scd41.ready():
-        time.sleep(0.2)
-        retries -= 1
-
-    if retries == 0:
-        return {}
-
-    scd_co2, scd_temp, scd_humidity = breakout_scd41.measure()
-
-    from ucollections import OrderedDict
-
-    return OrderedDict(
-        {"scd_co2": scd_co2, "scd_temperature": scd_temp, "scd_humidity": scd_humidity}
-    )
+from lib import sensirion_scd41
+from enviro import config
+from phew import logging
+
+MODES = ("periodic", "low_power", "single_shot")
+FIELDS = (("scd_co2", 0), ("scd_temperature", 2), ("scd_humidity", 2))
+
+# set by init() for the mode: covers a single shot, or the first periodic
+# sample after init (up to 30s in low_power, once per boot)
+ACQUIRE_TIMEOUT_MS = sensirion_scd41.SINGLE_SHOT_MS + 500
+
+# time until the first sample of each mode
+_FIRST_SAMPLE_MS = {
+    "periodic": sensirion_scd41.PERIODIC_INTERVAL_MS,
+    "low_power": sensirion_scd41.LOW_POWER_INTERVAL_MS,
+    "single_shot": sensirion_scd41.SINGLE_SHOT_MS,
+}
+
+
+def init(i2c, address):
+    global ACQUIRE_TIMEOUT_MS
+    sensor = sensirion_scd41.SCD41(i2c, address)
+    # a soft reset of the pico leaves the sensor measuring, stop it before reconfiguring
+    sensor.stop()
+
+    mode = config.scd41_mode
+    if mode not in MODES:
+        logging.warn(f"  - unknown scd41_mode '{mode}', using periodic")
+        mode = "periodic"
+    if mode != "single_shot":
+        # keeps measuring for the lifetime of the process
+        sensor.start_periodic(low_power=mode == "low_power")
+    ACQUIRE_TIMEOUT_MS = _FIRST_SAMPLE_MS[mode] + 500
+
+    return {"sensor": sensor, "mode": mode, "latest": None, "started": None}
+
+
+def start(state):
+    if state["mode"] == "single_shot":
+        state["latest"] = None
+        state["sensor"].measure_single_shot()
+        state["started"] = time.ticks_ms()
+    return state
+
+
+def poll(state, reading):
+    sensor = state["sensor"]
+    # the sensor is not to be talked to while a single shot runs
+    started = state["started"]
+    if started is not None:
+        if time.ticks_diff(time.ticks_ms(), started) < sensirion_scd41.SINGLE_SHOT_MS:
+            return None
+        state["started"] = None
+    if sensor.data_ready():
+        state["latest"] = sensor.read_measurement()
+    elif state["latest"] is None:
+        return None
+
+    # in periodic modes the newest sample is good enough, no need to wait for the
+    # next one: it can be up to 5s old, or 30s in low_power
+    reading["scd_co2"], reading["scd_temperature"], reading["scd_humidity"] = state["latest"]
+    return True
@@ -0,0 +1,89 @@
+import ujson
+from array import array
+
+# ================================================================
+# 📋 Fixed-schema reading record
+# ================================================================
+# every source declares its fields once as (name, decimals). the schema is
+# built at startup and one record is reused for every reading: sensors write
+# into a float array in place and serialisers walk it field by field, so a
+# reading cycle doesn't build and merge dictionaries.
+#
+# decimals: None keeps the value as is, 0 publishes an int, n rounds to n places
+
+NAN = float("nan")
+
+
+class Schema:
+    def __init__(self, fields):
+        self.names = tuple(name for name, _ in fields)
+        self.decimals = tuple(decimals for _, decimals in fields)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+
+class Reading:
+    """One reading laid out by a Schema, unset fields hold NaN."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.values = array("f", [NAN] * len(schema))
+
+    def clear(self):
+        values = self.values
+        for i in range(len(values)):
+            values[i] = NAN
+
+    def _value(self, i):
+        value = self.values[i]
+        decimals = self.schema.decimals[i]
+        if decimals is None:
+            return value
+        if decimals == 0:
+            return int(round(value))
+        return round(value, decimals)
+
+    def __setitem__(self, name, value):
+        self.values[self.schema.index[name]] = value
+
+    def __getitem__(self, name):
+        i = self.schema.index[name]
+        if self.values[i] != self.values[i]:
+            raise KeyError(name)
+        return self._value(i)
+
+    def __contains__(self, name):
+        i = self.schema.index.get(name)
+        return i is not None and self.values[i] == self.values[i]
+
+    def keys(self):
+        values = self.values
+        for i, name in enumerate(self.schema.names):
+            if values[i] == values[i]:
+                yield name
+
+    def __iter__(self):
+        return self.keys()
+
+    def items(self):
+        values = self.values
+        for i, name in enumerate(self.schema.names):
+            if values[i] == values[i]:
+                yield name, self._value(i)
+
+
+def write_json(f, items):
+    """Write (name, value) pairs as a JSON object without building a dict."""
+    f.write("{")
+    first = True
+    for name, value in items:
+        if not first:
+            f.write(",")
+        first = False
+        f.write('"')
+        f.write(name)
+        f.write('":')
+        f.write(ujson.dumps(value))
+    f.write("}")
@@ -0,0 +1,118 @@
+import struct
+from array import array
+
+# typecode, size, head, count, samples since reset, total, min, max
+_HEADER = "<BHHHIfff"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+
+
+class SampleRing:
+    """
+    Fixed-size ring of samples backed by an array.
+
+    - sum / mean() cover the samples currently held in the ring (window)
+    - min, max, n and total cover every sample pushed since reset()
+      so daily extremes and averages survive the ring wrapping
+    All updates are O(1) and the ring never reallocates.
+    """
+
+    def __init__(self, size, typecode="f"):
+        self.size = size
+        self.typecode = typecode
+        self.buf = array(typecode, [0] * size)
+        self.reset()
+
+    def reset(self):
+        for i in range(self.size):
+            self.buf[i] = 0
+        self.head = 0
+        self.count = 0
+        self.sum = 0
+        self.n = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def __len__(self):
+        return self.count
+
+    def push(self, value):
+        if self.count == self.size:
+            self.sum -= self.buf[self.head]
+        else:
+            self.count += 1
+        self.buf[self.head] = value
+        # add back the stored value so float32 rings never drift
+        value = self.buf[self.head]
+        self.sum += value
+        self.head = (self.head + 1) % self.size
+
+        self.n += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def mean(self):
+        """Mean of the samples currently in the ring."""
+        return self.sum / self.count if self.count else 0.0
+
+    def total_mean(self):
+        """Mean of every sample since reset."""
+        return self.total / self.n if self.n else 0.0
+
+    def last(self):
+        if not self.count:
+            return None
+        return self.buf[(self.head - 1) % self.size]
+
+    def values(self):
+        """Samples in the ring, oldest first."""
+        start = (self.head - self.count) % self.size
+        return [self.buf[(start + i) % self.size] for i in range(self.count)]
+
+    def window_min(self):
+        return min(self.values()) if self.count else None
+
+    def window_max(self):
+        return max(self.values()) if self.count else None
+
+    # binary serialisation
+    # ===========================================================================
+    def blob_size(self):
+        return _HEADER_SIZE + self.size * struct.calcsize(self.typecode)
+
+    def to_bytes(self):
+        header = struct.pack(
+            _HEADER,
+            ord(self.typecode),
+            self.size,
+            self.head,
+            self.count,
+            self.n,
+            self.total,
+            self.min if self.min is not None else 0.0,
+            self.max if self.max is not None else 0.0,
+        )
+        return header + bytes(self.buf)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        typecode, size, head, count, n, total, vmin, vmax = struct.unpack(_HEADER, blob[:_HEADER_SIZE])
+        ring = cls(size, chr(typecode))
+        if len(blob) != ring.blob_size() or head >= size or count > size:
+            raise ValueError("corrupt sample ring")
+        data = struct.unpack("<%d%s" % (size, ring.typecode), blob[_HEADER_SIZE:])
+        for i in range(size):
+            ring.buf[i] = data[i]
+        ring.head = head
+        ring.count = count
+        ring.n = n
+        ring.total = total
+        if n:
+            ring.min = vmin
+            ring.max = vmax
+        for value in ring.values():
+            ring.sum += value
+        return ring
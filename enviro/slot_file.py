@@ -0,0 +1,73 @@
+import struct
+import flash_stats
+import enviro.helpers as helpers
+
+# magic, sequence number, payload length, crc32 of the payload
+_SLOT_HEADER = "<HIHI"
+_SLOT_HEADER_SIZE = struct.calcsize(_SLOT_HEADER)
+_SLOT_MAGIC = 0x5E57
+
+
+class SlotFile:
+    """
+    Two fixed-size slots in one file, written alternately.
+
+    Each write goes to the slot that does *not* hold the newest record,
+    so a power cut mid-write can only damage the older copy. Loading
+    validates both slots by CRC and returns the newest valid payload.
+    """
+
+    def __init__(self, path, capacity):
+        self.path = path
+        self.capacity = capacity
+        self.slot_size = _SLOT_HEADER_SIZE + capacity
+        self.seq = 0
+        self.slot = 1  # so the first write lands in slot 0
+
+    def _read_slot(self, f, slot):
+        f.seek(slot * self.slot_size)
+        header = f.read(_SLOT_HEADER_SIZE)
+        if len(header) != _SLOT_HEADER_SIZE:
+            return None
+        magic, seq, length, crc = struct.unpack(_SLOT_HEADER, header)
+        if magic != _SLOT_MAGIC or length > self.capacity:
+            return None
+        payload = f.read(length)
+        if len(payload) != length or helpers.crc32(payload) != crc:
+            return None
+        return seq, payload
+
+    def load(self):
+        """Return the newest valid payload, or None if neither slot is valid."""
+        if not helpers.file_exists(self.path):
+            return None
+
+        newest = None
+        with open(self.path, "rb") as f:
+            for slot in (0, 1):
+                record = self._read_slot(f, slot)
+                if record is not None and (newest is None or record[0] > newest[0]):
+                    newest = record
+                    self.slot = slot
+
+        if newest is None:
+            return None
+        self.seq = newest[0]
+        return newest[1]
+
+    def save(self, payload):
+        if len(payload) > self.capacity:
+            raise ValueError("payload of {} bytes exceeds slot capacity".format(len(payload)))
+
+        slot = 1 - self.slot
+        seq = self.seq + 1
+        header = struct.pack(_SLOT_HEADER, _SLOT_MAGIC, seq, len(payload), helpers.crc32(payload))
+
+        mode = "r+b" if helpers.file_exists(self.path) else "wb"
+        with flash_stats.open(self.path, mode) as f:
+            f.seek(slot * self.slot_size)
+            f.write(header)
+            f.write(payload)
+
+        self.slot = slot
+        self.seq = seq
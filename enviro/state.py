@@ -0,0 +1,122 @@
+import struct
+from enviro.slot_file import SlotFile
+from phew import logging
+
+# ================================================================
+# 🗂️ Persistent state store
+# ================================================================
+# the small bits of runtime state (last reading, last ntp sync, pending
+# reupload, last ota check, the board's daily statistics) live in one
+# SlotFile. the store is read once, kept in RAM and written back in a single
+# atomic save at the end of each cycle, or on demand with flush().
+#
+# record: one entry per key, name length, name, type, value. entries carry
+# their type so keys declared by a board survive a load done before the
+# board is imported.
+
+STATE_FILE = "state.bin"
+# the weather board's daily statistics take about 1.6 KB of this
+STATE_CAPACITY = 2048
+
+# value types
+EPOCH = "I"  # seconds since 1970, also any unsigned 32 bit counter
+FLOAT = "f"
+BOOL = "?"
+BLOB = "b"
+
+# keys used by enviro itself, boards declare their own with declare()
+KEYS = {
+    "last_reading": EPOCH,
+    "last_ntp_sync": EPOCH,
+    "reattempt_upload": BOOL,
+    "ota_last_check": EPOCH,
+}
+
+
+def declare(name, kind):
+    KEYS[name] = kind
+
+
+def _encode(kind, value):
+    if kind == BLOB:
+        return struct.pack("<H", len(value)) + value
+    if kind == BOOL:
+        return b"\x01" if value else b"\x00"
+    return struct.pack("<" + kind, value)
+
+
+def _decode(kind, data, offset):
+    """Return (value, offset after it)."""
+    if kind == BLOB:
+        (length,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        return bytes(data[offset : offset + length]), offset + length
+    if kind == BOOL:
+        return data[offset] != 0, offset + 1
+    return struct.unpack_from("<" + kind, data, offset)[0], offset + struct.calcsize("<" + kind)
+
+
+class StateStore:
+    def __init__(self, path=STATE_FILE, capacity=STATE_CAPACITY):
+        self._file = SlotFile(path, capacity)
+        # name -> (type, value)
+        self._values = None
+        self._dirty = False
+
+    def _load(self):
+        self._values = {}
+        try:
+            data = self._file.load()
+        except OSError as e:
+            logging.error(f"! failed to read {self._file.path}: {e}")
+            data = None
+        if data is None:
+            return
+
+        offset = 0
+        try:
+            while offset < len(data):
+                length = data[offset]
+                name = bytes(data[offset + 1 : offset + 1 + length]).decode()
+                kind = chr(data[offset + 1 + length])
+                value, offset = _decode(kind, data, offset + 2 + length)
+                self._values[name] = (kind, value)
+        except Exception as e:
+            logging.error(f"! corrupt state entry in {self._file.path}: {e}")
+
+    def get(self, name, default=None):
+        if self._values is None:
+            self._load()
+        entry = self._values.get(name)
+        return default if entry is None else entry[1]
+
+    def set(self, name, value):
+        """Change a declared key in RAM, None removes it. Saved by the next flush()."""
+        kind = KEYS[name]
+        if self._values is None:
+            self._load()
+        if value is None:
+            if name in self._values:
+                del self._values[name]
+                self._dirty = True
+            return
+        if kind == EPOCH:
+            value = int(value)
+        entry = self._values.get(name)
+        if entry is None or entry[1] != value:
+            self._values[name] = (kind, value)
+            self._dirty = True
+
+    def flush(self):
+        """Write the store if anything changed since the last flush."""
+        if not self._dirty:
+            return
+        parts = []
+        for name, (kind, value) in self._values.items():
+            encoded = name.encode()
+            parts.append(bytes([len(encoded)]) + encoded + kind.encode() + _encode(kind, value))
+        self._file.save(b"".join(parts))
+        self._dirty = False
+
+
+store = StateStore()
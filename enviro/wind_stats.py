@@ -0,0 +1,114 @@
+import math
+from enviro.sample_ring import SampleRing
+
+# ================================================================
+# 💨 WMO-style wind statistics
+# ================================================================
+# anemometer pulses are sampled at a fixed cadence and folded into
+# three cascaded windows so every update is O(1):
+#   - 3 s of raw samples            -> rolling gust
+#   - 120 x 1 s means               -> 2 minute mean wind
+#   - 120 x 5 s means (+ gust max)  -> 10 minute mean / max gust
+
+SAMPLE_HZ = 4
+SAMPLE_MS = 1000 // SAMPLE_HZ
+GUST_SECONDS = 3
+MEAN_2M_SECONDS = 120
+MEAN_10M_BLOCK_SECONDS = 5
+MEAN_10M_BLOCKS = 600 // MEAN_10M_BLOCK_SECONDS
+# a gap longer than the 10 minute window carries no extra information
+MAX_BACKFILL_SAMPLES = 600 * SAMPLE_HZ
+
+# distance from the centre of the anemometer to the centre
+# of one of the cups in cm
+WIND_CM_RADIUS = 7.0
+# scaling factor for wind speed in m/s
+WIND_FACTOR = 0.0218
+# the reed switch changes state twice per rotation
+TRANSITIONS_PER_ROTATION = 2
+CM_PER_ROTATION = WIND_CM_RADIUS * 2.0 * math.pi
+
+
+def transitions_to_speed(transitions, elapsed_ms):
+    """Convert anemometer transitions over elapsed_ms into m/s."""
+    if elapsed_ms <= 0:
+        return 0.0
+    rotation_hz = (transitions * 1000.0 / elapsed_ms) / TRANSITIONS_PER_ROTATION
+    return rotation_hz * CM_PER_ROTATION * WIND_FACTOR
+
+
+class WindStats:
+    def __init__(self, sample_hz=SAMPLE_HZ):
+        self.sample_hz = sample_hz
+        self.gust = SampleRing(GUST_SECONDS * sample_hz)
+        self.mean_2m = SampleRing(MEAN_2M_SECONDS)
+        self.mean_10m = SampleRing(MEAN_10M_BLOCKS)
+        self.gust_10m = SampleRing(MEAN_10M_BLOCKS)
+
+        self._second_sum = 0.0
+        self._second_n = 0
+        self._block_sum = 0.0
+        self._block_n = 0
+        self._block_gust = 0.0
+
+        self.samples = 0
+        self.period_gust = 0.0
+
+    def add_sample(self, speed):
+        """Record one fixed-cadence sample (m/s)."""
+        self.samples += 1
+        self.gust.push(speed)
+
+        # a gust is only valid once the 3 s window is full
+        if self.gust.count == self.gust.size:
+            gust = self.gust.sum / self.gust.size
+            if gust > self.period_gust:
+                self.period_gust = gust
+            if gust > self._block_gust:
+                self._block_gust = gust
+
+        self._second_sum += speed
+        self._second_n += 1
+        if self._second_n < self.sample_hz:
+            return
+
+        second_mean = self._second_sum / self._second_n
+        self._second_sum = 0.0
+        self._second_n = 0
+        self.mean_2m.push(second_mean)
+
+        self._block_sum += second_mean
+        self._block_n += 1
+        if self._block_n < MEAN_10M_BLOCK_SECONDS:
+            return
+
+        self.mean_10m.push(self._block_sum / self._block_n)
+        self.gust_10m.push(self._block_gust)
+        self._block_sum = 0.0
+        self._block_n = 0
+        self._block_gust = 0.0
+
+    def current_gust(self):
+        """Mean of the last 3 s of samples (partial window if still filling)."""
+        return self.gust.mean()
+
+    def mean_2min(self):
+        if not self.mean_2m.count:
+            return self.current_gust()
+        return self.mean_2m.mean()
+
+    def mean_10min(self):
+        if not self.mean_10m.count:
+            return self.mean_2min()
+        return self.mean_10m.mean()
+
+    def max_gust_10min(self):
+        return max(self.gust_10m.window_max() or 0.0, self._block_gust)
+
+    def take_period_gust(self):
+        """Return the highest 3 s gust since the last call and reset it."""
+        gust = self.period_gust
+        if gust == 0.0 and self.gust.count < self.gust.size:
+            gust = self.current_gust()
+        self.period_gust = 0.0
+        return gust
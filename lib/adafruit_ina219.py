@@ -161,6 +161,24 @@ class INA219:
         raw_current = _to_signed(self._read_register(_REG_CURRENT))
         return raw_current * self._current_lsb
 
+    @property
+    def power(self):
+        """The power through the load in Watt"""
+        # same cal register safeguard as current
+        self._write_register(_REG_CALIBRATION, self._cal_value)
+
+        raw_power = self._read_register(_REG_POWER)
+        return raw_power * self._power_lsb
+
+    def set_averaging(self, samples):
+        """Average 1, 2, 4, ... 128 12-bit conversions for both the bus and shunt ADC"""
+        codes = {1: 0x3, 2: 0x9, 4: 0xA, 8: 0xB, 16: 0xC, 32: 0xD, 64: 0xE, 128: 0xF}
+        if samples not in codes:
+            raise ValueError("unsupported INA219 averaging {}".format(samples))
+        config = self._read_register(_REG_CONFIG) & ~(_CONFIG_BADCRES_MASK | _CONFIG_SADCRES_MASK)
+        config |= (codes[samples] << 7) | (codes[samples] << 3)
+        self._write_register(_REG_CONFIG, config)
+
     def set_calibration_32V_2A(self):  # pylint: disable=invalid-name
         """Configures to INA219 to be able to measure up to 32V and 2A
             of current. Counter overflow occurs at 3.2A.
@@ -16,6 +16,30 @@ REG_ALS_DATA = 0x0D
 REG_UVS_DATA = 0x10
 REG_STATUS = 0x07
 
+STATUS_DATA_READY = 0x08
+MODE_ALS = 0x02
+MODE_UVS = 0x0A
+
+# ganho: multiplicador -> código do registrador
+GAINS = (1, 3, 6, 9, 18)
+# resolução em bits -> (código, fator de integração, tempo de conversão em ms)
+RESOLUTIONS = {
+    20: (0, 4.0, 400),
+    19: (1, 2.0, 200),
+    18: (2, 1.0, 100),
+    17: (3, 0.5, 50),
+    16: (4, 0.25, 25),
+    13: (5, 0.03125, 13),
+}
+# código -> intervalo de medição em ms
+RATES_MS = (25, 50, 100, 200, 500, 1000, 2000)
+
+# sensibilidade UV (contagens por UVI) com ganho 18x e 20 bits
+UV_SENSITIVITY = 2300.0
+# faixa do ganho automático, em fração do fundo de escala
+AUTO_GAIN_HIGH = 0.9
+AUTO_GAIN_LOW = 0.5
+
 
 class LTR390:
     def __init__(self, i2c, address=LTR390_I2CADDR_DEFAULT):
@@ -24,11 +48,26 @@ class LTR390:
         part_id = self._read8(REG_PART_ID)
         if part_id != 0xB2:
             raise RuntimeError("LTR390 not found (ID=%02X)" % part_id)
-        self._write8(REG_MAIN_CTRL, 0x02)  # modo ALS
+        self._write8(REG_MAIN_CTRL, MODE_ALS)  # modo ALS
         time.sleep_ms(100)
         self.set_gain(3)
         self.set_rate(2)
 
+        # modo contínuo
+        self.auto_gain = False
+        self._gain = {MODE_ALS: 3, MODE_UVS: 3}
+        self._resolution = 18
+        self._int_factor = 1.0
+        self._conversion_ms = 100
+        # time between two conversions in continuous mode
+        self.interval_ms = RATES_MS[2]
+        self._channel = None
+        self._switched = time.ticks_ms()
+        self.als = None
+        self.uvs = None
+        self.lux = None
+        self.uvi = None
+
     def _read8(self, reg):
         return self.i2c.readfrom_mem(self.address, reg, 1)[0]
 
@@ -45,16 +84,98 @@ class LTR390:
 
     def set_rate(self, rate=2):
         # 0=25ms,1=50ms,2=100ms,3=200ms,4=500ms,5=1000ms,6=2000ms
-        self._write8(REG_MEAS_RATE, rate)
+        # preserva os bits de resolução (6:4)
+        self._write8(REG_MEAS_RATE, (self._read8(REG_MEAS_RATE) & 0x70) | rate)
+
+    def configure(self, gain=9, resolution=18, auto_gain=True):
+        """Gain multiplier (1/3/6/9/18), resolution in bits (13/16..20) and automatic gain ranging."""
+        if gain not in GAINS or resolution not in RESOLUTIONS:
+            raise ValueError("unsupported LTR390 gain {} / resolution {}".format(gain, resolution))
+        code, self._int_factor, self._conversion_ms = RESOLUTIONS[resolution]
+        rate = 0
+        while RATES_MS[rate] < self._conversion_ms:
+            rate += 1
+        self._write8(REG_MEAS_RATE, (code << 4) | rate)
+        self.interval_ms = RATES_MS[rate]
+        self._resolution = resolution
+        self._gain = {MODE_ALS: GAINS.index(gain), MODE_UVS: GAINS.index(gain)}
+        self.auto_gain = auto_gain
+
+    # leitura sem bloqueio: start_*() inicia a conversão, data_ready() indica o fim
+    def start_uvs(self):
+        self._write8(REG_MAIN_CTRL, MODE_UVS)  # modo UV
+
+    def start_als(self):
+        self._write8(REG_MAIN_CTRL, MODE_ALS)  # modo luz ambiente
+
+    def data_ready(self):
+        return bool(self._read8(REG_STATUS) & STATUS_DATA_READY)
+
+    def uvs_data(self):
+        return self._read24(REG_UVS_DATA)
+
+    def als_data(self):
+        return self._read24(REG_ALS_DATA)
 
     def read_uvs(self):
-        self._write8(REG_MAIN_CTRL, 0x0A)  # modo UV
+        self.start_uvs()
         time.sleep_ms(100)
-        val = self._read24(REG_UVS_DATA)
-        return val
+        return self.uvs_data()
 
     def read_als(self):
-        self._write8(REG_MAIN_CTRL, 0x02)  # modo luz ambiente
+        self.start_als()
         time.sleep_ms(100)
-        val = self._read24(REG_ALS_DATA)
-        return val
+        return self.als_data()
+
+    # modo contínuo intercalado
+    # ===========================================================================
+    # o sensor fica medindo um canal; quando o bit de dado pronto sobe,
+    # update() guarda o resultado e troca para o outro canal
+    def start_continuous(self, channel=MODE_ALS):
+        self._channel = channel
+        self._write8(REG_GAIN, self._gain[channel])
+        self._write8(REG_MAIN_CTRL, channel)
+        self._switched = time.ticks_ms()
+
+    def _range(self, channel, raw):
+        """Step the channel gain to keep raw counts in range, True if it changed."""
+        full_scale = (1 << self._resolution) - 1
+        index = self._gain[channel]
+        if raw > full_scale * AUTO_GAIN_HIGH and index > 0:
+            self._gain[channel] = index - 1
+            return True
+        if index < len(GAINS) - 1 and raw * GAINS[index + 1] / GAINS[index] < full_scale * AUTO_GAIN_LOW:
+            self._gain[channel] = index + 1
+            return True
+        return False
+
+    def update(self):
+        """
+        Non-blocking: store the running channel once its conversion is done and
+        move on to the other channel. Returns True when a channel value was updated.
+        """
+        if self._channel is None:
+            self.start_continuous()
+            return False
+        if time.ticks_diff(time.ticks_ms(), self._switched) < self._conversion_ms or not self.data_ready():
+            return False
+
+        channel = self._channel
+        gain = GAINS[self._gain[channel]]
+        raw = self.als_data() if channel == MODE_ALS else self.uvs_data()
+        saturated = raw > ((1 << self._resolution) - 1) * AUTO_GAIN_HIGH
+
+        if self.auto_gain and self._range(channel, raw) and saturated:
+            # resultado saturado: mede o mesmo canal de novo com ganho menor
+            self.start_continuous(channel)
+            return False
+
+        if channel == MODE_ALS:
+            self.als = raw
+            self.lux = 0.6 * raw / (gain * self._int_factor)
+        else:
+            self.uvs = raw
+            self.uvi = raw / (UV_SENSITIVITY * gain / 18.0 * self._int_factor / 4.0)
+
+        self.start_continuous(MODE_UVS if channel == MODE_ALS else MODE_ALS)
+        return True
@@ -0,0 +1,165 @@
+# lib/bme280_forced.py
+# MicroPython BME280 driver running in forced (one-shot) mode
+# register map, timings and compensation from the Bosch BME280 datasheet
+
+import struct
+import time
+
+BME280_I2CADDR_DEFAULT = 0x77
+BME280_CHIP_ID = 0x60
+
+# registers
+REG_CALIB_00 = 0x88
+REG_CALIB_H1 = 0xA1
+REG_CHIP_ID = 0xD0
+REG_CALIB_26 = 0xE1
+REG_CTRL_HUM = 0xF2
+REG_STATUS = 0xF3
+REG_CTRL_MEAS = 0xF4
+REG_CONFIG = 0xF5
+REG_DATA = 0xF7
+
+STATUS_MEASURING = 0x08
+
+MODE_SLEEP = 0x00
+MODE_FORCED = 0x01
+
+# oversampling / filter multiplier -> register code
+OVERSAMPLING = {0: 0, 1: 1, 2: 2, 4: 3, 8: 4, 16: 5}
+IIR_FILTER = {0: 0, 2: 1, 4: 2, 8: 3, 16: 4}
+
+
+class BME280:
+    def __init__(
+        self,
+        i2c,
+        address=BME280_I2CADDR_DEFAULT,
+        temperature_oversampling=1,
+        pressure_oversampling=1,
+        humidity_oversampling=1,
+        iir_filter=0,
+    ):
+        self.i2c = i2c
+        self.address = address
+        chip_id = self._read8(REG_CHIP_ID)
+        if chip_id != BME280_CHIP_ID:
+            raise RuntimeError("BME280 not found (ID=%02X)" % chip_id)
+        self._read_calibration()
+        self.configure(temperature_oversampling, pressure_oversampling, humidity_oversampling, iir_filter)
+
+    def _read8(self, reg):
+        return self.i2c.readfrom_mem(self.address, reg, 1)[0]
+
+    def _write8(self, reg, val):
+        self.i2c.writeto_mem(self.address, reg, bytes([val]))
+
+    def _read_calibration(self):
+        (self.t1, self.t2, self.t3, self.p1, self.p2, self.p3, self.p4, self.p5, self.p6, self.p7, self.p8, self.p9) = (
+            struct.unpack("<HhhHhhhhhhhh", self.i2c.readfrom_mem(self.address, REG_CALIB_00, 24))
+        )
+        self.h1 = self._read8(REG_CALIB_H1)
+
+        raw = self.i2c.readfrom_mem(self.address, REG_CALIB_26, 7)
+        self.h2, self.h3 = struct.unpack("<hB", raw[0:3])
+        e4, e5, e6, e7 = struct.unpack("<bBbb", raw[3:7])
+        self.h4 = (e4 << 4) | (e5 & 0x0F)
+        self.h5 = (e6 << 4) | (e5 >> 4)
+        self.h6 = e7
+
+    def configure(self, temperature_oversampling=1, pressure_oversampling=1, humidity_oversampling=1, iir_filter=0):
+        """Set oversampling (0/1/2/4/8/16) and IIR filter (0/2/4/8/16), leaving the sensor asleep."""
+        try:
+            self._osrs_t = OVERSAMPLING[temperature_oversampling]
+            self._osrs_p = OVERSAMPLING[pressure_oversampling]
+            self._osrs_h = OVERSAMPLING[humidity_oversampling]
+            filter_code = IIR_FILTER[iir_filter]
+        except KeyError as e:
+            raise ValueError("unsupported BME280 setting {}".format(e))
+        self._os = (temperature_oversampling, pressure_oversampling, humidity_oversampling)
+
+        # config can only be written reliably while asleep
+        self.sleep()
+        self._write8(REG_CONFIG, filter_code << 2)
+        self._write8(REG_CTRL_HUM, self._osrs_h)
+
+    def measurement_time_us(self, maximum=True):
+        """Datasheet measurement time (appendix B) for the configured oversampling."""
+        os_t, os_p, os_h = self._os
+        if maximum:
+            t = 1250 + 2300 * os_t
+            t += (2300 * os_p + 575) if os_p else 0
+            t += (2300 * os_h + 575) if os_h else 0
+        else:
+            t = 1000 + 2000 * os_t
+            t += (2000 * os_p + 500) if os_p else 0
+            t += (2000 * os_h + 500) if os_h else 0
+        return t
+
+    def sleep(self):
+        self._write8(REG_CTRL_MEAS, MODE_SLEEP)
+
+    def start(self):
+        """Trigger one forced measurement; the sensor goes back to sleep by itself."""
+        # ctrl_hum only takes effect after a write to ctrl_meas
+        self._write8(REG_CTRL_HUM, self._osrs_h)
+        self._write8(REG_CTRL_MEAS, (self._osrs_t << 5) | (self._osrs_p << 2) | MODE_FORCED)
+
+    def ready(self):
+        return not (self._read8(REG_STATUS) & STATUS_MEASURING)
+
+    def read_result(self):
+        """Compensated (temperature °C, pressure Pa, humidity %RH) of the last measurement."""
+        d = self.i2c.readfrom_mem(self.address, REG_DATA, 8)
+        adc_p = (d[0] << 12) | (d[1] << 4) | (d[2] >> 4)
+        adc_t = (d[3] << 12) | (d[4] << 4) | (d[5] >> 4)
+        adc_h = (d[6] << 8) | d[7]
+
+        # temperature
+        var1 = (adc_t / 16384.0 - self.t1 / 1024.0) * self.t2
+        var2 = adc_t / 131072.0 - self.t1 / 8192.0
+        var2 = var2 * var2 * self.t3
+        t_fine = var1 + var2
+        temperature = t_fine / 5120.0
+
+        # pressure
+        var1 = t_fine / 2.0 - 64000.0
+        var2 = var1 * var1 * self.p6 / 32768.0
+        var2 = var2 + var1 * self.p5 * 2.0
+        var2 = var2 / 4.0 + self.p4 * 65536.0
+        var1 = (self.p3 * var1 * var1 / 524288.0 + self.p2 * var1) / 524288.0
+        var1 = (1.0 + var1 / 32768.0) * self.p1
+        if var1 == 0:
+            pressure = 0.0
+        else:
+            pressure = 1048576.0 - adc_p
+            pressure = (pressure - var2 / 4096.0) * 6250.0 / var1
+            var1 = self.p9 * pressure * pressure / 2147483648.0
+            var2 = pressure * self.p8 / 32768.0
+            pressure = pressure + (var1 + var2 + self.p7) / 16.0
+
+        # humidity
+        h = t_fine - 76800.0
+        h = (adc_h - (self.h4 * 64.0 + self.h5 / 16384.0 * h)) * (
+            self.h2 / 65536.0 * (1.0 + self.h6 / 67108864.0 * h * (1.0 + self.h3 / 67108864.0 * h))
+        )
+        h = h * (1.0 - self.h1 * h / 524288.0)
+        humidity = max(0.0, min(100.0, h))
+
+        return temperature, pressure, humidity
+
+    def read(self, timeout_ms=None):
+        """
+        Take one forced measurement: wait the typical measurement time, then
+        poll the status register until the conversion is done.
+        Returns (temperature °C, pressure Pa, humidity %RH) like breakout_bme280.
+        """
+        self.start()
+        time.sleep_us(self.measurement_time_us(maximum=False))
+        if timeout_ms is None:
+            timeout_ms = self.measurement_time_us() // 1000 + 10
+        start = time.ticks_ms()
+        while not self.ready():
+            if time.ticks_diff(time.ticks_ms(), start) > timeout_ms:
+                raise OSError("BME280 measurement timed out")
+            time.sleep_us(500)
+        return self.read_result()
@@ -0,0 +1,116 @@
+# ================================================================
+# ⏱️ Boot profiler
+# ================================================================
+# opt-in with boot_profile = True in config.py. main.py calls start() before
+# importing enviro and finish() once startup is done; in between every first
+# import of a module and every mark() placed in the init code is timestamped
+# with ticks_us and the heap allocated so far. finish() writes the timeline
+# to BOOT_PROFILE_FILE, one line per step:
+#
+#   <ms since start> <ms for the step> <KB allocated by the step> <label>
+#
+# imports are timed through builtins.__import__ when the port allows
+# overriding it, nested imports are counted in their parent too.
+
+import gc, sys, time
+
+try:
+    import config
+
+    enabled = bool(getattr(config, "boot_profile", False))
+except Exception:
+    enabled = False
+
+BOOT_PROFILE_FILE = "boot_profile.txt"
+
+# (label, ticks_us when done, us taken, bytes allocated)
+_steps = []
+_started_us = None
+_started_alloc = 0
+_last_us = None
+_last_alloc = 0
+_original_import = None
+_summary = None
+
+
+def _import(name, *args):
+    if name in sys.modules:
+        return _original_import(name, *args)
+    started = time.ticks_us()
+    alloc = gc.mem_alloc()
+    module = _original_import(name, *args)
+    now = time.ticks_us()
+    _steps.append(("import " + name, now, time.ticks_diff(now, started), gc.mem_alloc() - alloc))
+    return module
+
+
+def start():
+    global _started_us, _started_alloc, _last_us, _last_alloc, _original_import
+    if not enabled:
+        return
+    _started_us = _last_us = time.ticks_us()
+    _started_alloc = _last_alloc = gc.mem_alloc()
+    try:
+        import builtins
+
+        _original_import = builtins.__import__
+        builtins.__import__ = _import
+    except Exception:
+        _original_import = None
+
+
+def mark(label):
+    """Record the step that ends now, a no-op unless profiling."""
+    global _last_us, _last_alloc
+    if _started_us is None:
+        return
+    now = time.ticks_us()
+    alloc = gc.mem_alloc()
+    _steps.append((label, now, time.ticks_diff(now, _last_us), alloc - _last_alloc))
+    # imports inside the step are timed on their own as well
+    _last_us = time.ticks_us()
+    _last_alloc = gc.mem_alloc()
+
+
+def finish():
+    """Stop profiling and write the timeline."""
+    global _started_us, _summary
+    if _started_us is None:
+        return
+    mark("finish")
+    if _original_import is not None:
+        import builtins
+
+        builtins.__import__ = _original_import
+
+    lines = []
+    # imports are only in the file, the published summary keeps to the marks
+    _summary = {}
+    for label, done, us, alloc in _steps:
+        at = time.ticks_diff(done, _started_us) // 1000
+        lines.append(f"{at} {us // 1000} {alloc // 1024} {label}")
+        if not label.startswith("import "):
+            _summary[label] = us // 1000
+    total = time.ticks_diff(_steps[-1][1], _started_us) // 1000
+    lines.append(f"{total} {total} {(gc.mem_alloc() - _started_alloc) // 1024} total")
+    _summary["total"] = total
+    _started_us = None
+    _steps.clear()
+
+    # imported here, at the top it would load before start() and miss the timeline
+    import flash_stats
+
+    try:
+        with flash_stats.open(BOOT_PROFILE_FILE, "w") as f:
+            f.write("\n".join(lines))
+            f.write("\n")
+    except OSError:
+        pass
+
+
+def take_summary():
+    """{step: ms} of the last profiled boot, returned once so it is published once."""
+    global _summary
+    summary = _summary
+    _summary = None
+    return summary
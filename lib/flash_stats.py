@@ -0,0 +1,186 @@
+# ================================================================
+# 💾 Flash write accounting
+# ================================================================
+# drop-in open() / remove() / rename() that count, for every logical file,
+# how often it is opened, how many bytes are written to it, whether it is
+# rewritten or appended to, and how long the writes take. the counts give an
+# estimate of the erase blocks used per day and so of the flash lifetime.
+#
+# logical files group everything in a directory: uploads/2024-05-01T... is
+# counted as "uploads/*".
+#
+# the estimate is deliberately rough: littlefs programs at least one block
+# for every file closed after a write (copy on write of the tail plus a
+# metadata commit), and one more for every full block of data written.
+
+import os, time
+
+BLOCK_SIZE = 4096
+# typical erase endurance of the Pico's QSPI flash sectors
+ERASE_CYCLES = 100000
+
+enabled = True
+
+# counters kept for each logical file
+OPENS = 0
+BYTES = 1
+REWRITES = 2
+APPENDS = 3
+UPDATES = 4
+REMOVES = 5
+WRITE_US = 6
+BLOCKS = 7
+_COUNTERS = 8
+
+_builtin_open = open
+_stats = {}
+# the clock is not set yet at import (the RTC and ntp sync come later), the
+# window starts with the first roll_day() instead
+_since = None
+_day = None
+
+
+def logical_name(path):
+    path = path.lstrip("/")
+    slash = path.find("/")
+    if slash == -1:
+        return path
+    return path[:slash + 1] + "*"
+
+
+def _entry(path):
+    key = logical_name(path)
+    entry = _stats.get(key)
+    if entry is None:
+        entry = _stats[key] = [0] * _COUNTERS
+    return entry
+
+
+class _File:
+    """A file opened for writing, counts the bytes and time spent writing."""
+
+    def __init__(self, f, entry):
+        self._f = f
+        self._entry = entry
+        self._written = 0
+
+    def write(self, data):
+        started = time.ticks_us()
+        result = self._f.write(data)
+        self._entry[WRITE_US] += time.ticks_diff(time.ticks_us(), started)
+        self._written += len(data)
+        return result
+
+    def close(self):
+        if self._f is None:
+            return
+        started = time.ticks_us()
+        self._f.close()
+        entry = self._entry
+        entry[WRITE_US] += time.ticks_diff(time.ticks_us(), started)
+        entry[BYTES] += self._written
+        entry[BLOCKS] += 1 + self._written // BLOCK_SIZE
+        self._f = None
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        return iter(self._f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def open(path, mode="r"):
+    """Open path like the builtin, files opened for writing are accounted."""
+    if not enabled:
+        return _builtin_open(path, mode)
+
+    started = time.ticks_us()
+    f = _builtin_open(path, mode)
+    entry = _entry(path)
+    entry[OPENS] += 1
+    if "w" in mode:
+        entry[REWRITES] += 1
+    elif "a" in mode:
+        entry[APPENDS] += 1
+    elif "+" in mode:
+        entry[UPDATES] += 1
+    else:
+        return f
+    entry[WRITE_US] += time.ticks_diff(time.ticks_us(), started)
+    return _File(f, entry)
+
+
+def remove(path):
+    os.remove(path)
+    if enabled:
+        entry = _entry(path)
+        entry[REMOVES] += 1
+        entry[BLOCKS] += 1
+
+
+def rename(source, target):
+    os.rename(source, target)
+    if enabled:
+        _entry(target)[BLOCKS] += 1
+
+
+def reset():
+    global _since
+    _stats.clear()
+    _since = time.time()
+
+
+def lifetime_days(blocks, seconds):
+    """Projected days until the filesystem blocks reach ERASE_CYCLES at this rate."""
+    if not blocks or seconds <= 0:
+        return None
+    try:
+        fs_blocks = os.statvfs("/")[2]
+    except OSError:
+        return None
+    return fs_blocks * ERASE_CYCLES / (blocks * 86400 / seconds)
+
+
+def report():
+    """The counters since the last reset as text, hottest file first."""
+    seconds = int(time.time() - _since) if _since is not None else 0
+    lines = [f"flash writes over {seconds // 3600}h{(seconds % 3600) // 60:02d}m"]
+    total_bytes = 0
+    total_blocks = 0
+    for key, entry in sorted(_stats.items(), key=lambda item: -item[1][BLOCKS]):
+        total_bytes += entry[BYTES]
+        total_blocks += entry[BLOCKS]
+        lines.append(
+            f"  {key}: {entry[OPENS]} opens, {entry[BYTES]} bytes, "
+            f"{entry[REWRITES]} rewrites, {entry[APPENDS]} appends, {entry[UPDATES]} updates, "
+            f"{entry[REMOVES]} removes, ~{entry[BLOCKS]} blocks, {entry[WRITE_US] // 1000} ms"
+        )
+    lines.append(f"  total: {total_bytes} bytes, ~{total_blocks} blocks")
+    days = lifetime_days(total_blocks, seconds)
+    if days is not None:
+        lines.append(f"  projected flash lifetime: {days / 365:.1f} years")
+    return "\n".join(lines)
+
+
+def roll_day(date):
+    """
+    Call with the current date once per cycle. Returns the report and resets
+    the counters when the date changes, None otherwise.
+    """
+    global _day, _since
+    if _day is None:
+        _day = date
+        _since = time.time()
+        return None
+    if date == _day:
+        return None
+    _day = date
+    text = report()
+    reset()
+    return text
@@ -1,21 +1,28 @@
 # lib/ota_light.py
-import os, ujson, uhashlib, machine, time, network
+# this file is not in the OTA manifest, a broken updater could not be fixed
+# over the air. changes to it (like installing the .mpy files) only reach a
+# station once it is reflashed over USB, older copies keep installing the
+# .py sources and ignore the "mpy" entries of the manifest.
+import os, sys, ujson, uhashlib, machine, time
 from phew import logging
+import flash_stats
 import enviro
+import enviro.energy as energy
+from enviro.state import store
+import enviro.config_store as config_store
 from enviro.version import __version__
-import urequests
 
 MANIFEST_URL = (
     "https://raw.githubusercontent.com/eduardokum/enviro/main/releases/manifest.json"
 )
-LAST_CHECK_FILE = "ota.txt"
 CHECK_INTERVAL_HOURS = 24  # check for OTA updates every 24 hours
 
 
 def _wifi_connected():
-    if not enviro.wifi_manager.connect():
-        return False
-    return True
+    energy.set_phase("wifi")
+    connected = enviro.get_wifi_manager().connect()
+    energy.set_phase(energy.IDLE)
+    return connected
 
 
 def _https_get(url):
@@ -24,6 +31,9 @@ def _https_get(url):
         logging.error("! OTA - Wi-Fi is not connected — cannot fetch {}".format(url))
         return None
 
+    # only pulled in once a check is due
+    import urequests
+
     try:
         r = urequests.get(url)
         status = getattr(r, "status_code", 200)
@@ -60,13 +70,13 @@ def _safe_write(path, data):
         except OSError:
             pass
     tmp = path + ".part"
-    with open(tmp, "wb") as f:
+    with flash_stats.open(tmp, "wb") as f:
         f.write(data)
     try:
-        os.remove(path)
+        flash_stats.remove(path)
     except OSError:
         pass
-    os.rename(tmp, path)
+    flash_stats.rename(tmp, path)
 
 
 def _read_file(path):
@@ -114,59 +124,29 @@ def check_and_update():
             return False
 
         logging.info("  - OTA New firmware version available: {}".format(new_version))
-        for f in manifest["files"]:
-            path = f["path"]
-            url = f["url"]
-            expected = f["sha256"]
-
-            local = _read_file(path)
-            if local and _sha256(local) == expected:
-                # Local file already matches expected hash
-                continue
-
-            logging.debug("  - OTA Updating file: {}".format(path))
-            data = _https_get(url)
-
-            if data is None:
-                logging.error("! OTA Failed to download file: {}".format(path))
-                continue
+        use_mpy = _mpy_compatible(manifest.get("mpy_version"))
+        if manifest.get("mpy_version") and not use_mpy:
+            logging.warn("  - OTA .mpy files built for another firmware, installing sources")
 
-            checksum = _sha256(data)
-            if checksum != expected:
-                logging.warn("  - OTA Invalid hash for file: {}, skipping.".format(path))
+        for f in manifest["files"]:
+            compiled = f.get("mpy")
+            if use_mpy and compiled and _install_file(compiled):
+                # MicroPython imports a .py before the .mpy next to it
+                _remove_file(f["path"])
                 continue
 
-            _safe_write(path, data)
-            logging.debug("  - OTA File updated successfully: {}".format(path))
+            if _install_file(f) and compiled:
+                _remove_file(compiled["path"])
 
         logging.info("  - OTA Firmware update applied successfully")
         _safe_write("enviro/version.py", f'__version__ = "{new_version}"\n')
         _write_last_check(now)
 
-        try:
-            with open("config.py", "r") as f:
-                lines = f.readlines()
-
-            new_lines = []
-            for line in lines:
-                stripped = line.lstrip()
-                if stripped.startswith("hass_discovery_triggered ="):
-                    # Build updated line preserving comment
-                    new_line = f"hass_discovery_triggered = False\n"
-                    new_lines.append(new_line)
-                else:
-                    new_lines.append(line)
-
-            # Write lines back to file (MicroPython-safe)
-            with open("config.py", "w") as f:
-                for line in new_lines:
-                    f.write(line)
-
+        if config_store.set("hass_discovery_triggered", False):
             logging.debug("  - OTA hass_discovery_triggered updated to False")
-        except:
-            pass
 
         logging.debug("  - OTA rebooting...")
+        enviro.flush_archive()
 
         time.sleep(2)
         machine.reset()
@@ -175,6 +155,48 @@ def check_and_update():
         logging.error("! OTA - failed:", e)
 
 
+def _install_file(f):
+    """Make the file at f["path"] match the manifest entry, True when it does."""
+    path = f["path"]
+    expected = f["sha256"]
+
+    local = _read_file(path)
+    if local and _sha256(local) == expected:
+        # Local file already matches expected hash
+        return True
+
+    logging.debug("  - OTA Updating file: {}".format(path))
+    data = _https_get(f["url"])
+
+    if data is None:
+        logging.error("! OTA Failed to download file: {}".format(path))
+        return False
+
+    checksum = _sha256(data)
+    if checksum != expected:
+        logging.warn("  - OTA Invalid hash for file: {}, skipping.".format(path))
+        return False
+
+    _safe_write(path, data)
+    logging.debug("  - OTA File updated successfully: {}".format(path))
+    return True
+
+
+def _remove_file(path):
+    try:
+        flash_stats.remove(path)
+    except OSError:
+        pass
+
+
+def _mpy_compatible(version):
+    """True when this firmware loads .mpy files of version [major, sub]."""
+    mpy = getattr(sys.implementation, "_mpy", None)
+    if not version or mpy is None:
+        return False
+    return list(version) == [mpy & 0xFF, (mpy >> 8) & 3]
+
+
 def _ensure_dir(path):
     """Create directories recursively (MicroPython compatible)."""
     parts = path.split("/")
@@ -191,17 +213,13 @@ def _ensure_dir(path):
 
 def _read_last_check():
     """Read timestamp of last OTA check."""
-    try:
-        with open(LAST_CHECK_FILE, "r") as f:
-            return float(f.read().strip())
-    except:
-        return 0.0
+    return store.get("ota_last_check", 0)
 
 
 def _write_last_check(ts):
-    """Write timestamp of last OTA check."""
-    with open(LAST_CHECK_FILE, "w") as f:
-        f.write(str(ts))
+    """Save timestamp of last OTA check, straight away as an update reboots."""
+    store.set("ota_last_check", ts)
+    store.flush()
 
 
 def _rtc_timestamp():
@@ -0,0 +1,72 @@
+# lib/sensirion_scd41.py
+# MicroPython driver for the Sensirion SCD41 CO2 sensor
+# commands and timings from the SCD4x datasheet
+
+import time
+
+SCD41_I2CADDR_DEFAULT = 0x62
+
+CMD_START_PERIODIC_MEASUREMENT = 0x21B1
+CMD_START_LOW_POWER_PERIODIC_MEASUREMENT = 0x21AC
+CMD_STOP_PERIODIC_MEASUREMENT = 0x3F86
+CMD_MEASURE_SINGLE_SHOT = 0x219D
+CMD_GET_DATA_READY_STATUS = 0xE4B8
+CMD_READ_MEASUREMENT = 0xEC05
+
+# time the sensor needs after stop_periodic_measurement before taking new commands
+STOP_DELAY_MS = 500
+# measurement interval of each mode
+PERIODIC_INTERVAL_MS = 5000
+LOW_POWER_INTERVAL_MS = 30000
+SINGLE_SHOT_MS = 5000
+
+
+def crc8(data):
+    # polynomial 0x31, init 0xFF
+    crc = 0xFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+class SCD41:
+    def __init__(self, i2c, address=SCD41_I2CADDR_DEFAULT):
+        self.i2c = i2c
+        self.address = address
+
+    def _command(self, cmd):
+        self.i2c.writeto(self.address, bytes([cmd >> 8, cmd & 0xFF]))
+
+    def _read_words(self, cmd, count):
+        self._command(cmd)
+        time.sleep_ms(1)
+        data = self.i2c.readfrom(self.address, count * 3)
+        words = []
+        for i in range(0, count * 3, 3):
+            if crc8(data[i : i + 2]) != data[i + 2]:
+                raise OSError("SCD41 crc mismatch")
+            words.append((data[i] << 8) | data[i + 1])
+        return words
+
+    def stop(self):
+        """Leave periodic mode, safe to call when the sensor is already idle."""
+        self._command(CMD_STOP_PERIODIC_MEASUREMENT)
+        time.sleep_ms(STOP_DELAY_MS)
+
+    def start_periodic(self, low_power=False):
+        """Measure every 5 s, or every 30 s in low power mode, until stop()."""
+        self._command(CMD_START_LOW_POWER_PERIODIC_MEASUREMENT if low_power else CMD_START_PERIODIC_MEASUREMENT)
+
+    def measure_single_shot(self):
+        """Trigger one measurement from idle, ready after SINGLE_SHOT_MS."""
+        self._command(CMD_MEASURE_SINGLE_SHOT)
+
+    def data_ready(self):
+        return (self._read_words(CMD_GET_DATA_READY_STATUS, 1)[0] & 0x07FF) != 0
+
+    def read_measurement(self):
+        """Returns (co2 ppm, temperature °C, humidity %RH) and clears the data ready flag."""
+        co2, temperature, humidity = self._read_words(CMD_READ_MEASUREMENT, 3)
+        return co2, -45.0 + 175.0 * temperature / 65535.0, 100.0 * humidity / 65535.0
@@ -2,6 +2,11 @@ from time import sleep
 
 sleep(0.5)
 
+# opt-in boot timeline (boot_profile = True in config.py)
+import boot_profile
+
+boot_profile.start()
+
 import enviro
 import ota_light as ota
 
@@ -10,6 +15,7 @@ try:
     enviro.startup()
 except Exception as exc:
     enviro.exception(exc)
+boot_profile.finish()
 
 while True:
     try:
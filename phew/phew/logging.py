@@ -1,5 +1,16 @@
 import machine, os, gc
 
+# count log writes with the firmware's flash accounting when it is installed
+try:
+  import flash_stats
+  _open = flash_stats.open
+  _remove = flash_stats.remove
+  _rename = flash_stats.rename
+except ImportError:
+  _open = open
+  _remove = os.remove
+  _rename = os.rename
+
 log_file = "log.txt"
 
 LOG_INFO = 0b00001
@@ -53,7 +64,7 @@ def truncate(file, target_size):
     return
 
   with open(file, "rb") as infile:
-    with open(file + ".tmp", "wb") as outfile:
+    with _open(file + ".tmp", "wb") as outfile:
       # skip a bunch of the input file until we've discarded
       # at least enough
       while discard > 0:
@@ -76,15 +87,15 @@ def truncate(file, target_size):
         outfile.write(chunk)
 
   # delete the old file and replace with the new
-  os.remove(file)
-  os.rename(file + ".tmp", file)
+  _remove(file)
+  _rename(file + ".tmp", file)
 
 
 def log(level, text):
   datetime = datetime_string()
   log_entry = "{0} [{1:8} /{2:>4}kB] {3}".format(datetime, level, round(gc.mem_free() / 1024), text)
   print(log_entry)
-  with open(log_file, "a") as logfile:
+  with _open(log_file, "a") as logfile:
     logfile.write(log_entry + '\n')
 
   if _log_truncate_at and file_size(log_file) > _log_truncate_at:
@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
-import os, json, hashlib, re
-import os, json, hashlib, re
+import os, sys, json, hashlib, re, shutil, subprocess
 
 # filtros de exclusão
-EXCLUDE_DIRS = {"tools", "__pycache__", "enviro/html", "phew", "documentation"}
+EXCLUDE_DIRS = {"tools", "__pycache__", "enviro/html", "phew", "documentation", "releases"}
 EXCLUDE_FILES = {
     "manifest.json",
     "config.py",
@@ -11,6 +10,7 @@ EXCLUDE_FILES = {
     "enviro/version.py",
     ".micropico",
     "documentation.md",
+    # nunca atualizado por OTA: mudanças no ota_light exigem regravar via USB
     "lib/ota_light.py",
     "install-on-device-fs.ps1",
     "LICENSE",
@@ -19,6 +19,14 @@ EXCLUDE_FILES = {
     "sync_time.txt",
     "last_time.txt",
     "daily_stats.json",
+    "daily_stats.bin",
+    "rain_log.bin",
+    "history.bin",
+    "archive.db",
+    "state.bin",
+    "flash_report.txt",
+    "config_overlay.json",
+    "boot_profile.txt",
 }
 EXCLUDE_EXTENSIONS = {".pyc", ".zip", ".DS_Store"}
 
@@ -26,6 +34,11 @@ MANIFEST_PATH = "releases/manifest.json"
 VERSION_FILE = "enviro/version.py"
 BASE_URL = "https://raw.githubusercontent.com/eduardokum/enviro/main/"
 
+# bytecode compilado com mpy-cross, publicado junto com os fontes
+MPY_DIR = "releases/mpy"
+# mantidos como .py: main.py é executado pelo nome, o template é lido como texto
+MPY_SKIP = {"main.py", "boot.py", "enviro/config_template.py"}
+
 
 def file_sha256(path):
     h = hashlib.sha256()
@@ -35,6 +48,36 @@ def file_sha256(path):
     return h.hexdigest()
 
 
+def find_mpy_cross():
+    """Command running mpy-cross, from PATH or the mpy-cross pip package, or None."""
+    path = shutil.which("mpy-cross")
+    if path:
+        return [path]
+    try:
+        import mpy_cross  # noqa: F401
+
+        return [sys.executable, "-m", "mpy_cross"]
+    except ImportError:
+        return None
+
+
+def compile_mpy(mpy_cross, rel):
+    """Compile rel into MPY_DIR and return the .mpy path relative to the repo."""
+    out = MPY_DIR + "/" + os.path.splitext(rel)[0] + ".mpy"
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    subprocess.run(mpy_cross + ["-o", out, "-s", rel, rel], check=True)
+    return out
+
+
+def mpy_version(path):
+    """[version, sub version] from the .mpy header, compared with sys.implementation._mpy on the device."""
+    with open(path, "rb") as f:
+        header = f.read(3)
+    if len(header) < 3 or header[0] != ord("M"):
+        raise ValueError(f"{path} is not an .mpy file")
+    return [header[1], header[2] & 3]
+
+
 def read_current_version():
     try:
         with open(VERSION_FILE) as f:
@@ -67,6 +110,13 @@ def main():
     print(f"Nova versão: {new_version}")
     write_new_version(new_version)
 
+    mpy_cross = find_mpy_cross()
+    if mpy_cross is None:
+        print("mpy-cross não encontrado, publicando apenas os fontes .py")
+    else:
+        shutil.rmtree(MPY_DIR, ignore_errors=True)
+    version = None
+
     files = []
     for d in ".":
         for root, dirs, names in os.walk(d):
@@ -104,9 +154,24 @@ def main():
 
                 url = BASE_URL + rel
                 sha = file_sha256(path)
-                files.append({"path": "/" + rel, "url": url, "sha256": sha})
+                entry = {"path": "/" + rel, "url": url, "sha256": sha}
+
+                if mpy_cross and ext == ".py" and rel not in MPY_SKIP:
+                    out = compile_mpy(mpy_cross, rel)
+                    print(f"Compilado {rel} → {out}")
+                    version = version or mpy_version(out)
+                    entry["mpy"] = {
+                        "path": "/" + os.path.splitext(rel)[0] + ".mpy",
+                        "url": BASE_URL + out,
+                        "sha256": file_sha256(out),
+                    }
+                files.append(entry)
 
     manifest = {"version": new_version, "files": files}
+    if version:
+        # ota_light instala os .mpy só se o firmware usar esta versão de bytecode;
+        # estações com um ota_light antigo ignoram a chave "mpy" e instalam os .py
+        manifest["mpy_version"] = version
 
     os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
     with open(MANIFEST_PATH, "w") as f:
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# decodes a reading archive export (ReadingArchive.export) into csv
+#   python tools/decode_archive.py export.bin > readings.csv
+import os, sys, struct, csv, math
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "enviro"))
+import gorilla  # noqa: E402
+
+
+def read_blocks(f):
+    """Yield (fields, block) for each block in the export, fields as (name, decimals)."""
+    while True:
+        header = f.read(4)
+        if len(header) < 4:
+            return
+        text_len, block_len = struct.unpack("<HH", header)
+        text = f.read(text_len).decode()
+        block = f.read(block_len)
+        fields = []
+        for field in text.split(","):
+            name, decimals = field.split(":")
+            fields.append((name, int(decimals) if decimals else None))
+        yield fields, block
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(f"usage: {sys.argv[0]} <export file>", file=sys.stderr)
+        sys.exit(1)
+
+    writer = csv.writer(sys.stdout)
+    header = None
+    with open(sys.argv[1], "rb") as f:
+        for fields, block in read_blocks(f):
+            names = [name for name, _ in fields]
+            if names != header:
+                header = names
+                writer.writerow(["timestamp"] + names)
+            for ts, values in gorilla.decode(block):
+                row = [ts]
+                floats = struct.unpack("<%df" % len(values), struct.pack("<%dI" % len(values), *values))
+                for (_, decimals), value in zip(fields, floats):
+                    if math.isnan(value):
+                        row.append("")
+                    elif decimals is None:
+                        row.append(value)
+                    elif decimals == 0:
+                        row.append(int(round(value)))
+                    else:
+                        row.append(round(value, decimals))
+                writer.writerow(row)
+
+
+if __name__ == "__main__":
+    main()